@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from metrics.timing import increment
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "responses")
+
+def normalize_idea(idea):
+    return ' '.join(idea.lower().split())
+
+def make_key(idea, prompt_template, model_name, variant=""):
+    # variant covers request options that change the answer without changing the prompt text
+    template_hash = hashlib.sha256(prompt_template.encode('utf-8')).hexdigest()
+    raw = f"{model_name}\0{template_hash}\0{variant}\0{normalize_idea(idea)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """Parsed AI responses on disk, one JSON file per key.
+
+    Entries expire after ttl seconds; once max_entries or max_bytes is
+    exceeded the least recently used files (by mtime, refreshed on every
+    hit) are removed.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_entries=1000, max_bytes=64 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = {}
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if not name.endswith('.json'):
+                        continue
+                    try:
+                        st = os.stat(os.path.join(self.directory, name))
+                    except OSError:
+                        continue
+                    self._index[name[:-5]] = [st.st_mtime, st.st_size]
+        return self._index
+
+    def get(self, key):
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self._miss()
+                return None
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self._miss()
+                return None
+            if time.time() - entry.get("created", 0) > self.ttl:
+                self._remove(key)
+                self._miss()
+                return None
+            now = time.time()
+            try:
+                os.utime(self._path(key), (now, now))
+            except OSError:
+                pass
+            index[key][0] = now
+            self.hits += 1
+            increment("ai.cache.hits")
+            return entry["data"]
+
+    def put(self, key, data, idea=None):
+        entry = json.dumps({"created": time.time(), "idea": idea, "data": data})
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(self.directory, exist_ok=True)
+            # several processes may share the directory, and thread ids repeat across them
+            tmp = self._path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(entry)
+            os.replace(tmp, self._path(key))
+            index[key] = [time.time(), os.path.getsize(self._path(key))]
+            self._evict()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._load_index()
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            index = self._load_index()
+            return {"hits": self.hits, "misses": self.misses, "entries": len(index),
+                    "bytes": sum(size for _, size in index.values())}
+
+    def _miss(self):
+        self.misses += 1
+        increment("ai.cache.misses")
+
+    def _remove(self, key):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        index = self._index
+        total = sum(size for _, size in index.values())
+        if len(index) <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, (_, size) in sorted(index.items(), key=lambda item: item[1][0]):
+            if len(index) <= self.max_entries and total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(os.getenv("ai_repo_cache_dir") or CACHE_DIR)
+    return _default_cache
@@ -1,53 +1,411 @@
-import json
-from google import generativeai as genai
-from dotenv import load_dotenv
+import asyncio
+import itertools
+import threading
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-load_dotenv()
-genai.configure(api_key=os.getenv("gemini_api_key"))
+from ai.cache import get_cache, make_key
+from ai.ratelimit import get_limiter
+from ai.resilience import get_policy
+from ai.json_extract import extract_object
+from ai.schema import generation_config, missing_fields
+from ai.similarity import get_index
+from ai.stream_parser import JSONFieldStream
+from file_manager.templates import detect_stacks
+from metrics.timing import span, increment
 
-def generate_with_ai(idea, log_callback):
-    try:
-        prompt = f"""
+MODEL_NAME = "gemini-2.5-flash-lite"
+
+FIELD_SPECS = {
+    "repo_name": "name with hyphens, no spaces, alphanumeric only",
+    "description": "brief description",
+    "readme": "complete README.md content",
+    "gitignore": ".gitignore content",
+    "license_text": "MIT license text",
+    "requirements": "requirements.txt if needed (can be empty string)",
+}
+
+# artifacts that can be borrowed from a near-duplicate idea
+REUSABLE_FIELDS = ("gitignore", "license_text", "requirements")
+
+# fixed texts that file_manager.templates fills in locally unless the model is asked for them
+TEMPLATE_FIELDS = ("gitignore", "license_text")
+
+# in split mode each group is its own request, so wall-clock time is the slowest group
+# rather than the sum of every field's output tokens
+ARTIFACT_GROUPS = (("repo_name", "description"), ("readme",), ("gitignore", "requirements"), ("license_text",))
+
+PROMPT_TEMPLATE = """
         Create a GitHub repository for: {idea}
-        
+
         Return ONLY valid JSON with:
-        - "repo_name": name with hyphens, no spaces, alphanumeric only
-        - "description": brief description  
-        - "readme": complete README.md content
-        - "gitignore": .gitignore content
-        - "license_text": MIT license text
-        - "requirements": requirements.txt if needed (can be empty string)
-        
+{fields}
+
         NO code blocks, NO explanations, ONLY JSON.
         """
-        
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-        response = model.generate_content(prompt)
-        raw = response.text.strip()
-        
-        if raw.startswith("```"):
-            lines = raw.split('\n')
-            start_idx = 0
-            for i, line in enumerate(lines):
-                if not line.strip().startswith('```') and 'json' not in line.lower():
-                    start_idx = i
-                    break
-            end_idx = len(lines)
-            for i in range(len(lines)-1, -1, -1):
-                if not lines[i].strip().startswith('```'):
-                    end_idx = i + 1
-                    break
-            raw = '\n'.join(lines[start_idx:end_idx])
-                
-        data = json.loads(raw)
+
+_genai = None
+_sdk_lock = threading.Lock()
+_model = None
+_model_lock = threading.Lock()
+_model_override = False
+_key_models = {}
+
+def load_sdk():
+    # the google.generativeai stack takes longer to import than the whole GUI,
+    # so it is loaded on first use (or from a background thread) instead of at import
+    global _genai
+    if _genai is None:
+        with _sdk_lock:
+            if _genai is None:
+                from dotenv import load_dotenv
+                from google import generativeai as genai
+                load_dotenv()
+                pool_keys = [k.strip() for k in os.getenv("gemini_api_keys", "").split(",") if k.strip()]
+                genai.configure(api_key=os.getenv("gemini_api_key") or next(iter(pool_keys), None))
+                _genai = genai
+    return _genai
+
+def sdk_loaded():
+    return _genai is not None
+
+def get_model():
+    # one shared model keeps the underlying client and its pooled connections alive
+    global _model
+    if _model is None:
+        genai = load_sdk()
+        with _model_lock:
+            if _model is None:
+                _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+def set_model(model):
+    # lets benchmarks and tests swap in a stand-in with the same generate_content API
+    global _model, _model_override
+    with _model_lock:
+        _model = model
+        _model_override = True
+
+def model_for_key(key, async_client=False):
+    """The shared model, or one whose client authenticates with key (from the gemini_api_keys pool)"""
+    if key is None or _model_override:
+        return get_model()
+    model = _key_models.get(key)
+    if model is None:
+        genai = load_sdk()
+        with _model_lock:
+            model = _key_models.get(key)
+            if model is None:
+                from google.ai import generativelanguage as glm
+                model = genai.GenerativeModel(MODEL_NAME)
+                # genai.configure is process-wide, so a per-key client is attached to the model directly
+                model._client = glm.GenerativeServiceClient(client_options={"api_key": key})
+                _key_models[key] = model
+    if async_client and getattr(model, "_async_client", None) is None:
+        from google.ai import generativelanguage as glm
+        model._async_client = glm.GenerativeServiceAsyncClient(client_options={"api_key": key})
+    return model
+
+def build_prompt(idea, fields=None):
+    fields = fields or list(FIELD_SPECS)
+    lines = '\n'.join(f'        - "{field}": {FIELD_SPECS[field]}' for field in fields)
+    return PROMPT_TEMPLATE.format(idea=idea, fields=lines)
+
+def output_options(fields, json_mode):
+    # with a declared schema the model returns bare JSON with exactly these fields
+    return {"generation_config": generation_config(fields, FIELD_SPECS)} if json_mode else {}
+
+def _time_left(end):
+    # what the rate limiter's waits left of the attempt's timeout goes to the request itself
+    return max(0.001, end - time.monotonic())
+
+def _stream_in_slot(prompt, options, timeout):
+    # the request slot stays taken until the last chunk is read or the consumer drops the stream
+    end = time.monotonic() + timeout
+    with get_limiter().slot(prompt, timeout) as (slot, estimate):
+        response = model_for_key(slot.key).generate_content(prompt, request_options={"timeout": _time_left(end)},
+                                                           **options)
+        chunk = None
+        for chunk in response:
+            yield chunk
+        if chunk is not None:
+            slot.record(chunk, estimate)
+
+def call_model(prompt, options, log_callback=None):
+    """generate_content under the rate limiter and the current deadline/retry/hedging policy"""
+    get_model()  # loads the SDK and .env before the key pool reads its settings
+
+    def attempt(timeout):
+        if options.get("stream"):
+            # reading the first chunk inside the attempt lets the policy retry a stream that fails to open
+            chunks = _stream_in_slot(prompt, options, timeout)
+            first = next(chunks, None)
+            return chunks if first is None else itertools.chain((first,), chunks)
+        end = time.monotonic() + timeout
+        with get_limiter().slot(prompt, timeout) as (slot, estimate):
+            response = model_for_key(slot.key).generate_content(prompt, request_options={"timeout": _time_left(end)},
+                                                               **options)
+            slot.record(response, estimate)
+            return response
+
+    return get_policy().call(attempt, log_callback)
+
+async def call_model_async(prompt, options, log_callback=None):
+    get_model()
+
+    async def attempt(timeout):
+        end = time.monotonic() + timeout
+        async with get_limiter().slot_async(prompt, timeout) as (slot, estimate):
+            response = await model_for_key(slot.key, async_client=True).generate_content_async(
+                prompt, request_options={"timeout": _time_left(end)}, **options)
+            slot.record(response, estimate)
+            return response
+
+    return await get_policy().call_async(attempt, log_callback)
+
+def _decode(raw, log_callback, fields=None):
+    """Return (data, missing): the decoded object and the requested fields it lacks"""
+    increment("ai.parse.total")
+    data, complete = extract_object(raw)
+    if not isinstance(data, dict) or not (complete or fields):
+        increment("ai.parse.failed")
+        log_callback("❌ Invalid JSON from AI: no complete JSON object in the response")
+        log_callback(f"Raw response: {raw[:200]}...")
+        return None, []
+    missing = missing_fields(data, fields) if fields else []
+    if missing and len(missing) == len(fields):
+        increment("ai.parse.failed")
+        log_callback(f"❌ AI response does not match the schema: missing {', '.join(missing)}")
+        return None, []
+    if missing:
+        # the closed fields are kept so only the rest has to be generated again
+        increment("ai.parse.salvaged")
+        increment("ai.parse.salvaged_fields", len(fields) - len(missing))
+    return data, missing
+
+def parse_response(raw, log_callback, fields=None):
+    data, missing = _decode(raw, log_callback, fields)
+    if missing:
+        increment("ai.parse.failed")
+        log_callback(f"❌ AI response does not match the schema: missing {', '.join(missing)}")
+        return None
+    if data is not None:
         log_callback("✅ AI generation completed!")
+    return data
+
+def _salvage_message(fields, missing):
+    kept = [field for field in fields if field not in missing]
+    return f"🩹 AI response was incomplete: kept {', '.join(kept)}, requesting {', '.join(missing)} again"
+
+def _merge_salvaged(data, rest, missing, log_callback):
+    if rest is None:
+        return None
+    if missing:
+        increment("ai.parse.failed")
+        log_callback(f"❌ AI response does not match the schema: missing {', '.join(missing)}")
+        return None
+    return {**data, **rest}
+
+def _request_fields(idea, fields, log_callback, json_mode=True):
+    # one request for fields; a truncated answer costs a second request for the missing fields only
+    with span("ai.generate"):
+        response = call_model(build_prompt(idea, fields), output_options(fields, json_mode), log_callback)
+    with span("ai.parse"):
+        data, missing = _decode(response.text, log_callback, fields)
+    if data is None or not missing:
         return data
-        
-    except json.JSONDecodeError as e:
-        log_callback(f"❌ Invalid JSON from AI: {str(e)}")
-        log_callback(f"Raw response: {raw[:200]}...")
+    log_callback(_salvage_message(fields, missing))
+    with span("ai.generate"):
+        response = call_model(build_prompt(idea, missing), output_options(missing, json_mode), log_callback)
+    with span("ai.parse"):
+        rest, still_missing = _decode(response.text, log_callback, missing)
+    return _merge_salvaged(data, rest, still_missing, log_callback)
+
+async def _request_fields_async(idea, fields, log_callback, json_mode=True):
+    with span("ai.generate"):
+        response = await call_model_async(build_prompt(idea, fields), output_options(fields, json_mode), log_callback)
+    with span("ai.parse"):
+        data, missing = _decode(response.text, log_callback, fields)
+    if data is None or not missing:
+        return data
+    log_callback(_salvage_message(fields, missing))
+    with span("ai.generate"):
+        response = await call_model_async(build_prompt(idea, missing), output_options(missing, json_mode),
+                                          log_callback)
+    with span("ai.parse"):
+        rest, still_missing = _decode(response.text, log_callback, missing)
+    return _merge_salvaged(data, rest, still_missing, log_callback)
+
+def split_fields(fields):
+    return [group for group in ([f for f in g if f in fields] for g in ARTIFACT_GROUPS) if group]
+
+def merge_parts(groups, parts, log_callback):
+    if any(part is None for part in parts):
+        return None
+    data = {}
+    for group, part in zip(groups, parts):
+        data.update({field: part.get(field, '') for field in group})
+    log_callback("✅ AI generation completed!")
+    return data
+
+def _generate_split(idea, fields, log_callback, json_mode=True):
+    groups = split_fields(fields)
+
+    # one thread per group: the sync client is thread-safe, while the async one is tied to its event loop
+    with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="ai-split") as pool:
+        parts = list(pool.map(lambda group: _request_fields(idea, group, log_callback, json_mode), groups))
+    return merge_parts(groups, parts, log_callback)
+
+async def _generate_split_async(idea, fields, log_callback, json_mode=True):
+    groups = split_fields(fields)
+    parts = await asyncio.gather(*(_request_fields_async(idea, group, log_callback, json_mode) for group in groups))
+    return merge_parts(groups, parts, log_callback)
+
+def cache_key(idea, templates=True, json_mode=True, split=False):
+    # each of these changes what comes back for the same idea, so they get separate entries
+    variant = f"templates={int(bool(templates))};json_mode={int(bool(json_mode))};split={int(bool(split))}"
+    return make_key(idea, build_prompt(""), MODEL_NAME, variant)
+
+def cached_response(idea, log_callback=None, templates=True, json_mode=True, split=False):
+    data = get_cache().get(cache_key(idea, templates, json_mode, split))
+    if data is not None and log_callback:
+        log_callback("⚡ Reusing cached AI response for this idea")
+    return data
+
+def store_response(idea, data, templates=True, json_mode=True, split=False):
+    try:
+        get_cache().put(cache_key(idea, templates, json_mode, split), data, idea)
+    except OSError:
+        pass
+
+def similar_scaffold(idea, log_callback):
+    # a Go CLI and a Python CLI read alike, but must never share requirements or a .gitignore
+    stacks = detect_stacks(idea)
+    try:
+        match = get_index().lookup(idea, accept=lambda other: detect_stacks(other) == stacks)
+    except OSError:
+        return {}
+    if not match:
+        return {}
+    log_callback(f"♻️ Similar idea found ({match['score']:.0%} match): reusing its .gitignore, LICENSE and requirements")
+    return {field: match["payload"].get(field, '') for field in REUSABLE_FIELDS}
+
+def remember_idea(idea, data):
+    try:
+        get_index().add(idea, {field: data.get(field, '') for field in REUSABLE_FIELDS})
+    except OSError:
+        pass
+
+def _finish(idea, data, reused, use_cache, variant):
+    if data is None:
         return None
+    if reused:
+        data = {**reused, **{k: v for k, v in data.items() if k not in reused}}
+    else:
+        remember_idea(idea, data)
+    if use_cache:
+        store_response(idea, data, *variant)
+    return data
+
+def requested_fields(reused, templates):
+    skip = set(reused) | (set(TEMPLATE_FIELDS) if templates else set())
+    return [field for field in FIELD_SPECS if field not in skip]
+
+def generate_with_ai(idea, log_callback, use_cache=True, refresh=False, reuse_similar=True, split=False,
+                     templates=True, json_mode=True):
+    if use_cache and not refresh:
+        data = cached_response(idea, log_callback, templates, json_mode, split)
+        if data is not None:
+            return data
+    reused = similar_scaffold(idea, log_callback) if reuse_similar else {}
+    fields = requested_fields(reused, templates)
+    try:
+        if split:
+            with span("ai.generate_split"):
+                data = _generate_split(idea, fields, log_callback, json_mode)
+        else:
+            data = _request_fields(idea, fields, log_callback, json_mode)
+            if data is not None:
+                log_callback("✅ AI generation completed!")
     except Exception as e:
         log_callback(f"❌ AI generation failed: {str(e)}")
         return None
+    return _finish(idea, data, reused, use_cache, (templates, json_mode, split))
+
+def generate_with_ai_stream(idea, log_callback, on_event, stream_keys=("readme",), templates=True, json_mode=True):
+    # fields in stream_keys are only handed to on_event chunk by chunk and never held in memory
+    parser = JSONFieldStream()
+    data, parts = {}, {}
+    fields = requested_fields({}, templates)
+    try:
+        with span("ai.stream"):
+            # opening the stream is retried under the policy; a stream that breaks midway is not,
+            # since its chunks have already been handed to on_event
+            response = call_model(build_prompt(idea, fields), dict(output_options(fields, json_mode), stream=True),
+                                  log_callback)
+            for chunk in response:
+                for event, key, value in parser.feed(chunk.text):
+                    if key in stream_keys:
+                        on_event(event, key, value)
+                        continue
+                    if event == "start":
+                        parts[key] = []
+                    elif event == "chunk":
+                        parts[key].append(value)
+                    else:
+                        data[key] = ''.join(parts.pop(key)) if value is None else value
+                        on_event("end", key, data[key])
+                        continue
+                    on_event(event, key, value)
+    except Exception as e:
+        log_callback(f"❌ AI generation failed: {str(e)}")
+        return None
+    increment("ai.parse.total")
+    if not parser.done:
+        increment("ai.parse.failed")
+        log_callback("❌ Invalid JSON from AI: response ended before the object was closed")
+        return None
+    log_callback("✅ AI generation completed!")
+    remember_idea(idea, data)
+    return data
+
+async def generate_with_ai_async(idea, log_callback, use_cache=True, refresh=False, reuse_similar=True, split=False,
+                                 templates=True, json_mode=True):
+    if use_cache and not refresh:
+        data = cached_response(idea, log_callback, templates, json_mode, split)
+        if data is not None:
+            return data
+    reused = similar_scaffold(idea, log_callback) if reuse_similar else {}
+    fields = requested_fields(reused, templates)
+    try:
+        if split:
+            with span("ai.generate_split"):
+                data = await _generate_split_async(idea, fields, log_callback, json_mode)
+        else:
+            data = await _request_fields_async(idea, fields, log_callback, json_mode)
+            if data is not None:
+                log_callback("✅ AI generation completed!")
+    except Exception as e:
+        log_callback(f"❌ AI generation failed: {str(e)}")
+        return None
+    return _finish(idea, data, reused, use_cache, (templates, json_mode, split))
+
+def warm_up(log_callback=None):
+    # a tiny count_tokens call opens the connection (TLS handshake) before real work arrives
+    try:
+        get_model().count_tokens("ping")
+        return True
+    except Exception as e:
+        if log_callback:
+            log_callback(f"⚠️ AI warm-up failed: {str(e)}")
+        return False
+
+async def warm_up_async(log_callback=None):
+    try:
+        await get_model().count_tokens_async("ping")
+        return True
+    except Exception as e:
+        if log_callback:
+            log_callback(f"⚠️ AI warm-up failed: {str(e)}")
+        return False
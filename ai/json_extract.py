@@ -0,0 +1,55 @@
+import json
+import re
+from itertools import islice
+
+from ai.stream_parser import parse_fields
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_decoder = json.JSONDecoder()
+# an object worth decoding opens with a key; '{' in prose or in code inside a JSON string does not
+_OBJECT_START = re.compile(r'\{\s*"')
+MAX_CANDIDATES = 32
+
+def loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+def extract_object(text):
+    """Find the JSON object in text and decode it.
+
+    Fences, prose before the opening brace and text after the closing one
+    are ignored, including prose that has braces of its own. Returns
+    (data, complete): for a truncated object, data holds every field whose
+    value was fully closed and complete is False; data is None when no
+    object with any field can be found at all.
+    """
+    start = text.find('{')
+    if start < 0:
+        return None, False
+    end = text.rfind('}')
+    if end > start:
+        # common case: nothing but whitespace, a fence or prose around one complete object
+        try:
+            data = loads(text[start:end + 1])
+            if data:
+                return data, True
+        except ValueError:
+            pass
+    candidates = [match.start() for match in islice(_OBJECT_START.finditer(text, start), MAX_CANDIDATES)]
+    for position in candidates:
+        try:
+            # raw_decode stops at the end of the object, so a trailing '}' in prose does not matter
+            data, _ = _decoder.raw_decode(text, position)
+        except ValueError:
+            continue
+        if isinstance(data, dict) and data:
+            return data, True
+    # nothing decodes as a whole: keep every field that did close, from the first object that has any
+    for position in candidates:
+        data, complete = parse_fields(text[position:])
+        if data:
+            return data, complete
+    return None, False
@@ -0,0 +1,253 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from metrics.timing import increment, observe
+
+# rough prompt size in tokens; corrected from usage_metadata once the answer arrives
+CHARS_PER_TOKEN = 4
+EXPECTED_OUTPUT_TOKENS = 2500
+
+def is_throttled(error):
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests") or getattr(error, "code", None) == 429
+
+class TokenBucket:
+    """Refills per_minute units evenly over a minute, holding at most burst of them.
+
+    Reservations are taken immediately and may drive the balance negative,
+    so callers queue up in arrival order instead of racing for the refill.
+    """
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0
+        self.burst = burst or per_minute
+        self.balance = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.burst, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount):
+        """How long a reservation of amount would have to wait right now"""
+        with self._lock:
+            self._refill()
+            return max(0.0, amount - self.balance) / self.rate
+
+    def reserve(self, amount):
+        """Take amount units and return how long to wait before using them"""
+        with self._lock:
+            self._refill()
+            self.balance -= amount
+            return 0.0 if self.balance >= 0 else -self.balance / self.rate
+
+    def adjust(self, amount):
+        # give back (or take) the difference between an estimate and the real usage
+        with self._lock:
+            self.balance = min(self.burst, self.balance - amount)
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight.
+
+    Every healthy answer adds 1/limit (about +1 per full window); a 429
+    halves the limit. Like TCP, only requests started after the last
+    decrease can trigger the next one, so a burst of rejections from the
+    same window counts as a single congestion signal.
+    """
+
+    def __init__(self, maximum=256, minimum=1, initial=None, decrease=0.5):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(initial or maximum)
+        self.decrease = decrease
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def try_acquire(self):
+        """Return the start time of the granted request, or None when the limit is reached"""
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return time.monotonic()
+            return None
+
+    def acquire(self, timeout=None):
+        """Wait for room under the limit; raise TimeoutError if none frees up within timeout seconds"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                raise TimeoutError("no AI request slot freed up before the deadline")
+            self.in_flight += 1
+            return time.monotonic()
+
+    async def acquire_async(self, timeout=None):
+        # polling keeps the event loop free; waits here are short compared to a model call
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            started = self.try_acquire()
+            if started is not None:
+                return started
+            if end is not None and time.monotonic() >= end:
+                raise TimeoutError("no AI request slot freed up before the deadline")
+            await asyncio.sleep(0.02)
+
+    def release(self, started, outcome="ok"):
+        # outcome is "ok", "throttled" (a 429) or "error", which leaves the limit alone
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                if started >= self.last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.last_decrease = time.monotonic()
+                    increment("ai.limit.decreased")
+            elif outcome == "ok":
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+class KeySlot:
+    def __init__(self, key, rpm, tpm, concurrency):
+        self.key = key
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = concurrency
+
+    def load(self):
+        # seconds of quota wait first, then how full the concurrency window is
+        wait = max(self.requests.delay(1) if self.requests else 0.0,
+                   self.tokens.delay(EXPECTED_OUTPUT_TOKENS) if self.tokens else 0.0)
+        return wait, self.concurrency.in_flight / max(1.0, self.concurrency.limit)
+
+    def reserve(self, estimate):
+        """Take one request and estimate tokens from the buckets; return seconds to wait"""
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(estimate))
+        if wait > 0:
+            increment("ai.limit.waits")
+            observe("ai.limit.wait", wait)
+        return wait
+
+    def refund(self, estimate):
+        if self.requests:
+            self.requests.adjust(-1)
+        if self.tokens:
+            self.tokens.adjust(-estimate)
+
+    def record(self, response, estimate):
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", None)
+        if self.tokens and isinstance(actual, int):
+            self.tokens.adjust(actual - estimate)
+
+class KeyPool:
+    """Spreads AI calls over one or more API keys, each with its own quota.
+
+    Each key gets requests/minute and tokens/minute buckets plus an AIMD
+    concurrency limit; a call goes to the least loaded key. key None
+    means the key the SDK was configured with.
+    """
+
+    def __init__(self, keys=(None,), rpm=None, tpm=None, max_concurrency=256):
+        self.slots = [KeySlot(key, rpm, tpm, AdaptiveConcurrency(max_concurrency)) for key in keys or (None,)]
+
+    @classmethod
+    def from_env(cls, rpm=None, tpm=None, max_concurrency=256):
+        # keys and limits usually live in .env, which load_sdk() may not have read yet
+        from dotenv import load_dotenv
+        load_dotenv()
+        keys = [k.strip() for k in os.getenv("gemini_api_keys", "").split(",") if k.strip()]
+        rpm = rpm if rpm is not None else _env_number("ai_repo_rpm")
+        tpm = tpm if tpm is not None else _env_number("ai_repo_tpm")
+        return cls(keys or (None,), rpm, tpm, max_concurrency)
+
+    def pick(self):
+        return min(self.slots, key=KeySlot.load)
+
+    @staticmethod
+    def estimate(prompt):
+        return len(prompt) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+    def _reserve(self, prompt, timeout):
+        # the deadline is fixed before any waiting, so quota and concurrency waits share it
+        end = None if timeout is None else time.monotonic() + timeout
+        slot = self.pick()
+        estimate = self.estimate(prompt)
+        wait = slot.reserve(estimate)
+        if timeout is not None and wait > timeout:
+            slot.refund(estimate)
+            raise TimeoutError(f"rate limit would delay this AI request by {wait:.0f}s")
+        return slot, estimate, wait, end
+
+    @staticmethod
+    def _left(end):
+        return None if end is None else end - time.monotonic()
+
+    @contextmanager
+    def slot(self, prompt, timeout=None):
+        """Wait for quota and a free request slot on the least loaded key and yield (slot, token estimate).
+
+        Both waits count against timeout; a caller passing the same timeout
+        on to its request should take off the time spent in here.
+        """
+        slot, estimate, wait, end = self._reserve(prompt, timeout)
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            started = slot.concurrency.acquire(self._left(end))
+        except TimeoutError:
+            slot.refund(estimate)
+            raise
+        outcome = "ok"
+        try:
+            yield slot, estimate
+        except Exception as e:
+            outcome = "throttled" if is_throttled(e) else "error"
+            raise
+        finally:
+            slot.concurrency.release(started, outcome)
+
+    @asynccontextmanager
+    async def slot_async(self, prompt, timeout=None):
+        slot, estimate, wait, end = self._reserve(prompt, timeout)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            started = await slot.concurrency.acquire_async(self._left(end))
+        except TimeoutError:
+            slot.refund(estimate)
+            raise
+        outcome = "ok"
+        try:
+            yield slot, estimate
+        except Exception as e:
+            outcome = "throttled" if is_throttled(e) else "error"
+            raise
+        finally:
+            slot.concurrency.release(started, outcome)
+
+def _env_number(name):
+    value = os.getenv(name)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = KeyPool.from_env()
+    return _limiter
+
+def set_limiter(limiter):
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
@@ -0,0 +1,260 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from ai.ratelimit import is_throttled
+from metrics.timing import increment, observe, registry
+
+# google.api_core exception names (and HTTP codes) worth another attempt
+TRANSIENT_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "Unknown"}
+TRANSIENT_CODES = {408, 429, 500, 502, 503, 504}
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class CircuitOpen(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def is_transient(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in TRANSIENT_ERRORS:
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in TRANSIENT_CODES
+
+class CircuitBreaker:
+    """Fails fast after threshold consecutive backend failures (5xx, timeouts).
+
+    Once open, calls are refused for reset_after seconds; then a single
+    trial call is let through and its outcome closes or reopens the circuit.
+    Quota errors (429) say nothing about the backend's health and are left
+    to the rate limiter.
+    """
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_after or self.trial:
+                increment("ai.circuit.rejected")
+                retry_after = max(0.0, self.reset_after - waited)
+                raise CircuitOpen(f"AI backend unavailable, retry in {retry_after:.1f}s", retry_after)
+            self.trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.threshold:
+                if self.opened_at is None or self.trial:
+                    increment("ai.circuit.opened")
+                self.opened_at = time.monotonic()
+                self.trial = False
+
+class Policy:
+    """Deadline, jittered exponential retry and optional hedging for one AI call.
+
+    deadline bounds the whole call, retries included. With hedge on, a
+    second identical request goes out if the first has not answered after
+    the observed hedge_quantile of request latency, and the first answer wins.
+    """
+
+    def __init__(self, deadline=90.0, retries=3, base_delay=0.5, max_delay=8.0, hedge=False,
+                 hedge_quantile=0.95, min_hedge_delay=1.0, default_hedge_delay=5.0, breaker=None):
+        self.deadline = deadline
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def _deadline_error(self):
+        return DeadlineExceeded(f"AI request exceeded its {self.deadline:g}s deadline")
+
+    def hedge_delay(self):
+        observed = registry.quantile("ai.request", self.hedge_quantile)
+        return max(self.min_hedge_delay, observed if observed is not None else self.default_hedge_delay)
+
+    def backoff(self, attempt):
+        # "full jitter": spreads retries from many workers instead of having them return in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _retry_delay(self, error, attempt, end, log_callback):
+        """Seconds to wait before the next attempt, or None when error should be raised"""
+        if not is_transient(error):
+            # the backend answered, it just did not like the request
+            self.breaker.record_success()
+            return None
+        if not is_throttled(error):
+            self.breaker.record_failure()
+        if attempt >= self.retries:
+            return None
+        delay = self.backoff(attempt)
+        if time.monotonic() + delay >= end:
+            return None
+        increment("ai.retry")
+        if log_callback:
+            log_callback(f"🔁 AI request failed ({str(error) or type(error).__name__}), retrying in {delay:.1f}s...")
+        return delay
+
+    def _circuit_delay(self, end, log_callback):
+        """Seconds to wait for an open circuit, or raise CircuitOpen when the deadline cannot cover it"""
+        try:
+            self.breaker.allow()
+            return 0.0
+        except CircuitOpen as e:
+            # while a trial call is out, poll again shortly instead of waiting a full reset period
+            delay = e.retry_after or self.base_delay
+            if time.monotonic() + delay >= end:
+                raise
+            if log_callback and e.retry_after:
+                log_callback(f"⏸️ {e}; waiting")
+            return delay
+
+    def call(self, func, log_callback=None):
+        """Run func(timeout) under the policy; timeout is the time left in the deadline"""
+        end = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            delay = self._circuit_delay(end, log_callback)
+            if delay:
+                time.sleep(delay)
+                continue
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise self._deadline_error()
+            try:
+                result = self._hedged(func, end) if self.hedge else _timed(func, remaining)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, end, log_callback)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _hedged(self, func, end):
+        futures = [_executor.submit(_timed, func, end - time.monotonic())]
+        done, _ = wait(futures, timeout=min(self.hedge_delay(), max(0.0, end - time.monotonic())))
+        if not done and end - time.monotonic() > 0:
+            increment("ai.hedge")
+            futures.append(_executor.submit(_timed, func, end - time.monotonic()))
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise self._deadline_error()
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def call_async(self, func, log_callback=None):
+        """Async version of call; func(timeout) returns an awaitable"""
+        end = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            delay = self._circuit_delay(end, log_callback)
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise self._deadline_error()
+            try:
+                if self.hedge:
+                    result = await self._hedged_async(func, end)
+                else:
+                    result = await self._attempt_async(func, remaining)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, end, log_callback)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _attempt_async(self, func, remaining):
+        task = asyncio.ensure_future(_timed_async(func, remaining))
+        done, _ = await asyncio.wait({task}, timeout=remaining)
+        if not done:
+            task.cancel()
+            raise self._deadline_error()
+        return task.result()
+
+    async def _hedged_async(self, func, end):
+        tasks = {asyncio.ensure_future(_timed_async(func, end - time.monotonic()))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=min(self.hedge_delay(), max(0.0, end - time.monotonic())))
+            if not done and end - time.monotonic() > 0:
+                increment("ai.hedge")
+                tasks.add(asyncio.ensure_future(_timed_async(func, end - time.monotonic())))
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, end - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise self._deadline_error()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+def _timed(func, timeout):
+    started = time.perf_counter()
+    result = func(timeout)
+    observe("ai.request", time.perf_counter() - started)
+    return result
+
+async def _timed_async(func, timeout):
+    started = time.perf_counter()
+    result = await func(timeout)
+    observe("ai.request", time.perf_counter() - started)
+    return result
+
+# hedged attempts that lose keep running until the client's own timeout, so this pool is generous
+_executor = ThreadPoolExecutor(max_workers=256, thread_name_prefix="ai-hedge")
+_policy = Policy()
+
+def get_policy():
+    return _policy
+
+def set_policy(policy):
+    global _policy
+    _policy = policy
@@ -0,0 +1,16 @@
+JSON_MIME_TYPE = "application/json"
+
+def response_schema(fields, specs):
+    """OpenAPI-style schema for an object holding the requested string fields"""
+    return {
+        "type": "object",
+        "properties": {field: {"type": "string", "description": specs[field]} for field in fields},
+        "required": list(fields),
+    }
+
+def generation_config(fields, specs):
+    return {"response_mime_type": JSON_MIME_TYPE, "response_schema": response_schema(fields, specs)}
+
+def missing_fields(data, fields):
+    """Requested fields that data lacks or holds as something other than a string"""
+    return [field for field in fields if not isinstance(data.get(field), str)]
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+
+INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "similar_ideas.jsonl")
+
+NUM_PERM = 80
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+MERSENNE = (1 << 61) - 1
+
+STOPWORDS = {
+    "a", "an", "the", "for", "of", "in", "on", "to", "and", "or", "with", "from", "that",
+    "this", "my", "your", "using", "use", "based", "into", "by", "is", "it", "as", "at",
+    "which", "simple", "small", "app", "application", "tool", "project", "repo", "repository",
+}
+
+_rng = random.Random(1337)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE), _rng.randrange(0, MERSENNE)) for _ in range(NUM_PERM)]
+
+def _stem(word):
+    for suffix in ("ing", "ers", "er", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def tokenize(text):
+    words = re.findall(r"[a-z0-9+#]+", text.lower())
+    return {_stem(w) for w in words if w not in STOPWORDS}
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def signature(tokens):
+    hashes = [_token_hash(t) for t in tokens] or [0]
+    return [min(((a * h + b) % MERSENNE) & 0xffffffff for h in hashes) for a, b in PERMUTATIONS]
+
+def _bands(sig):
+    return [hash((i, tuple(sig[i * ROWS:(i + 1) * ROWS]))) for i in range(BANDS)]
+
+class SimilarityIndex:
+    """MinHash/LSH index over previously generated ideas.
+
+    Each entry keeps the idea's token set, its signature and the reusable
+    artifacts generated for it. Entries are appended to a JSONL file so
+    the index survives restarts; lookups only compare against ideas that
+    share at least one LSH band, then rank them by exact Jaccard.
+    """
+
+    def __init__(self, path=INDEX_PATH, threshold=0.6):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries = None
+        self._buckets = {}
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = []
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._insert(entry["idea"], set(entry["tokens"]), entry["sig"], entry["payload"])
+
+    def _insert(self, idea, tokens, sig, payload):
+        position = len(self._entries)
+        self._entries.append((idea, frozenset(tokens), payload))
+        for band in _bands(sig):
+            self._buckets.setdefault(band, []).append(position)
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+    def lookup(self, idea, threshold=None, accept=None):
+        """Closest stored idea at or above threshold, considering only those accept(other_idea) allows"""
+        threshold = self.threshold if threshold is None else threshold
+        tokens = tokenize(idea)
+        if not tokens:
+            return None
+        sig = signature(tokens)
+        with self._lock:
+            self._load()
+            candidates = set()
+            for band in _bands(sig):
+                candidates.update(self._buckets.get(band, ()))
+            best, best_score = None, 0.0
+            for position in candidates:
+                other_idea, other_tokens, payload = self._entries[position]
+                if accept is not None and not accept(other_idea):
+                    continue
+                score = len(tokens & other_tokens) / len(tokens | other_tokens)
+                if score > best_score:
+                    best, best_score = (other_idea, payload), score
+        if best is None or best_score < threshold:
+            return None
+        return {"idea": best[0], "score": best_score, "payload": best[1]}
+
+    def add(self, idea, payload):
+        tokens = tokenize(idea)
+        if not tokens:
+            return
+        sig = signature(tokens)
+        line = json.dumps({"idea": idea, "tokens": sorted(tokens), "sig": sig, "payload": payload})
+        with self._lock:
+            self._load()
+            self._insert(idea, tokens, sig, payload)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+_default_index = None
+_default_lock = threading.Lock()
+
+def get_index():
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SimilarityIndex(
+                os.getenv("ai_repo_similarity_index") or INDEX_PATH,
+                float(os.getenv("ai_repo_similarity_threshold") or 0.6))
+    return _default_index
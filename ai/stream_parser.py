@@ -0,0 +1,175 @@
+import json
+
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+SEEK, OBJECT, KEY, COLON, VALUE, STRING, RAW, DONE = range(8)
+
+class JSONFieldStream:
+    """Incremental parser for a flat JSON object arriving in chunks.
+
+    feed() returns events as they become available:
+    ("start", key, None), ("chunk", key, text) for string values and
+    ("end", key, value) when a field closes (value is None for strings,
+    whose content has already been delivered as chunks).
+    Anything before the opening brace (fences, prose) is skipped.
+    """
+
+    def __init__(self):
+        self.state = SEEK
+        self.key = None
+        self._key_parts = []
+        self._escape = ''
+        self._high_surrogate = None
+        self._raw = []
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+
+    @property
+    def done(self):
+        return self.state == DONE
+
+    def feed(self, text):
+        events = []
+        i, n = 0, len(text)
+        while i < n:
+            state = self.state
+            if state == SEEK:
+                j = text.find('{', i)
+                if j < 0:
+                    return events
+                self.state = OBJECT
+                i = j + 1
+            elif state == OBJECT:
+                c = text[i]
+                i += 1
+                if c == '"':
+                    self._key_parts = []
+                    self.state = KEY
+                elif c == '}':
+                    self.state = DONE
+            elif state == KEY:
+                i = self._read_string(text, i, self._key_parts.append)
+                if self.state == COLON:
+                    self.key = ''.join(self._key_parts)
+            elif state == COLON:
+                c = text[i]
+                i += 1
+                if c == ':':
+                    self.state = VALUE
+            elif state == VALUE:
+                c = text[i]
+                if c.isspace():
+                    i += 1
+                elif c == '"':
+                    i += 1
+                    self.state = STRING
+                    events.append(("start", self.key, None))
+                else:
+                    self._raw = []
+                    self._raw_depth = 0
+                    self._raw_in_string = False
+                    self._raw_escape = False
+                    self.state = RAW
+                    events.append(("start", self.key, None))
+            elif state == STRING:
+                parts = []
+                i = self._read_string(text, i, parts.append)
+                chunk = ''.join(parts)
+                if chunk:
+                    events.append(("chunk", self.key, chunk))
+                if self.state == OBJECT:
+                    events.append(("end", self.key, None))
+            elif state == RAW:
+                i = self._read_raw(text, i, events)
+            else:
+                return events
+        return events
+
+    def _read_string(self, text, i, emit):
+        # fast path: copy everything up to the next quote or backslash in one slice
+        n = len(text)
+        while i < n:
+            if self._escape:
+                i = self._read_escape(text, i, emit)
+                continue
+            q = text.find('"', i)
+            b = text.find('\\', i)
+            if b >= 0 and (q < 0 or b < q):
+                if b > i:
+                    emit(text[i:b])
+                self._escape = '\\'
+                i = b + 1
+            elif q >= 0:
+                if q > i:
+                    emit(text[i:q])
+                self.state = COLON if self.state == KEY else OBJECT
+                return q + 1
+            else:
+                emit(text[i:])
+                return n
+        return i
+
+    def _read_escape(self, text, i, emit):
+        self._escape += text[i]
+        i += 1
+        esc = self._escape
+        if len(esc) == 2 and esc[1] != 'u':
+            self._escape = ''
+            emit(ESCAPES.get(esc[1], esc[1]))
+        elif len(esc) == 6:
+            self._escape = ''
+            code = int(esc[2:], 16)
+            if 0xD800 <= code < 0xDC00:
+                self._high_surrogate = code
+            elif 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                emit(chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)))
+                self._high_surrogate = None
+            else:
+                emit(chr(code))
+        return i
+
+    def _read_raw(self, text, i, events):
+        n = len(text)
+        start = i
+        while i < n:
+            c = text[i]
+            if self._raw_in_string:
+                if self._raw_escape:
+                    self._raw_escape = False
+                elif c == '\\':
+                    self._raw_escape = True
+                elif c == '"':
+                    self._raw_in_string = False
+            elif c == '"':
+                self._raw_in_string = True
+            elif c in '[{':
+                self._raw_depth += 1
+            elif c in ']}' and self._raw_depth > 0:
+                self._raw_depth -= 1
+            elif (c == ',' or c == '}') and self._raw_depth == 0:
+                self._raw.append(text[start:i])
+                raw = ''.join(self._raw).strip()
+                try:
+                    value = json.loads(raw)
+                except ValueError:
+                    value = raw
+                events.append(("end", self.key, value))
+                self.state = DONE if c == '}' else OBJECT
+                return i + 1
+            i += 1
+        self._raw.append(text[start:])
+        return n
+
+def parse_fields(text):
+    """Return every field that is fully closed in text, even if the object itself is truncated."""
+    stream = JSONFieldStream()
+    fields, parts = {}, {}
+    for event, key, data in stream.feed(text):
+        if event == "start":
+            parts[key] = []
+        elif event == "chunk":
+            parts[key].append(data)
+        elif event == "end":
+            fields[key] = ''.join(parts.pop(key)) if data is None else data
+    return fields, stream.done
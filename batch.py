@@ -0,0 +1,166 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from ai.generator import warm_up
+from ai.ratelimit import KeyPool, set_limiter
+from ai.resilience import Policy, set_policy
+from file_manager.creator import FSYNC_POLICIES
+from file_manager.journal import JOURNAL_PATH, Journal, job_key
+from file_manager.pipeline import create_repository
+from metrics.timing import registry, METRICS_DIR
+
+print_lock = threading.Lock()
+
+def log_line(message):
+    with print_lock:
+        print(message, flush=True)
+
+def read_ideas(path, fmt="auto"):
+    if fmt == "auto":
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    handle = sys.stdin if path == "-" else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == "csv":
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return
+            column = header.index("idea") if "idea" in header else 0
+            if "idea" not in header and header[column].strip():
+                yield header[column].strip()
+            for row in reader:
+                if len(row) > column and row[column].strip():
+                    yield row[column].strip()
+        else:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                idea = item.get("idea", "") if isinstance(item, dict) else str(item)
+                if idea.strip():
+                    yield idea.strip()
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def run_job(job_id, idea, folder, options, log=log_line, job=None):
+    def job_log(message):
+        log(f"[job {job_id}] {message}")
+
+    started = time.perf_counter()
+    try:
+        result = create_repository(idea, folder, job_log, job=job, **options)
+    except Exception as e:
+        result = {"idea": idea, "status": "failed", "repo_name": None,
+                  "repo_path": None, "repo_url": None, "error": str(e)}
+        job_log(f"❌ Unexpected system error: {str(e)}")
+        if job is not None:
+            job.fail(str(e))
+    result["job"] = job_id
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+def journaled_result(job_id, job):
+    # a job finished by an earlier run is reported, not repeated
+    return {"idea": job.idea, "status": "created", "repo_name": job.repo_name, "repo_path": job.repo_path,
+            "repo_url": job.repo_url, "error": None, "job": job_id, "seconds": 0.0, "resumed": True}
+
+def run_batch(ideas, folder, workers, log=log_line, journal=None, **options):
+    results = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for job_id, idea in enumerate(ideas, 1):
+            # keep at most 2x workers in flight so huge files are never fully buffered
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(f.result() for f in done)
+            job = journal.open(job_key(job_id, idea), idea) if journal is not None else None
+            if job is not None and job.done:
+                results.append(journaled_result(job_id, job))
+                continue
+            pending.add(pool.submit(run_job, job_id, idea, folder, options, log, job))
+        for future in pending:
+            results.append(future.result())
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda r: r["job"])
+    return results, elapsed
+
+def print_report(results, elapsed):
+    created = sum(1 for r in results if r["status"] == "created")
+    log_line("")
+    log_line("📊 Batch summary")
+    for r in results:
+        mark = "✅" if r["status"] == "created" else "❌"
+        detail = r["repo_url"] or r["error"] or ""
+        log_line(f"{mark} job {r['job']:>4} {r['seconds']:>7.2f}s  {r['repo_name'] or '-'}  {detail}")
+    rate = created / (elapsed / 60) if elapsed > 0 else 0.0
+    log_line(f"🚀 {created}/{len(results)} repositories created in {elapsed:.1f}s ({rate:.2f} repos/minute)")
+    counters = registry.snapshot()["counters"]
+    parsed, failed = counters.get("ai.parse.total", 0), counters.get("ai.parse.failed", 0)
+    if parsed:
+        log_line(f"🧩 {failed}/{parsed} AI responses failed to parse ({failed / parsed:.1%})")
+    hits, misses = counters.get("ai.cache.hits", 0), counters.get("ai.cache.misses", 0)
+    if hits + misses:
+        log_line(f"⚡ {hits}/{hits + misses} AI responses served from the cache ({hits / (hits + misses):.1%})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create GitHub repositories in bulk from an ideas file")
+    parser.add_argument("ideas", help="JSONL (one {\"idea\": ...} per line) or CSV file with an 'idea' column, '-' for stdin")
+    parser.add_argument("--dest", required=True, help="folder where the repositories are created")
+    parser.add_argument("--workers", type=int, default=4, help="number of repositories processed in parallel")
+    parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto")
+    parser.add_argument("--stream", action="store_true", help="write files while the AI response is still streaming")
+    parser.add_argument("--no-cache", action="store_true", help="always call the AI, never read or write the response cache")
+    parser.add_argument("--refresh-cache", action="store_true", help="call the AI and overwrite any cached response")
+    parser.add_argument("--no-reuse-similar", action="store_true", help="do not borrow .gitignore/LICENSE/requirements from near-duplicate ideas")
+    parser.add_argument("--ai-boilerplate", action="store_true", help="let the AI write LICENSE and .gitignore instead of using the bundled templates")
+    parser.add_argument("--free-form-json", action="store_true", help="do not declare a response schema; strip code fences from plain-text answers instead")
+    parser.add_argument("--split", action="store_true", help="request name, README, .gitignore/requirements and LICENSE concurrently as separate prompts")
+    parser.add_argument("--deadline", type=float, default=90.0, help="seconds allowed for each AI call, retries included")
+    parser.add_argument("--retries", type=int, default=3, help="retries on transient AI errors (429, 5xx, timeouts)")
+    parser.add_argument("--hedge", action="store_true", help="send a second AI request when the first is slower than the observed p95")
+    parser.add_argument("--rpm", type=float, help="AI requests per minute allowed per API key (default: env ai_repo_rpm, else unlimited)")
+    parser.add_argument("--tpm", type=float, help="AI tokens per minute allowed per API key (default: env ai_repo_tpm, else unlimited)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, help="how scaffold files are flushed to disk (default: env ai_repo_fsync, else none)")
+    parser.add_argument("--github-api", action="store_true", help="create repositories through the GitHub REST API instead of gh")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="where stage latency histograms are exported (JSON and Prometheus text)")
+    parser.add_argument("--report", help="write per-job results as JSON to this file")
+    parser.add_argument("--journal", nargs="?", const=JOURNAL_PATH,
+                        help=f"record each job's progress in this SQLite file and resume unfinished jobs on the next run (default: {JOURNAL_PATH})")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dest, exist_ok=True)
+    set_limiter(KeyPool.from_env(args.rpm, args.tpm))
+    set_policy(Policy(deadline=args.deadline, retries=max(0, args.retries), hedge=args.hedge))
+    warm_up(log_line)
+    journal = Journal(args.journal) if args.journal else None
+    if journal is not None:
+        log_line(f"📒 Journal {args.journal}: {journal.counts() or 'empty'}")
+    results, elapsed = run_batch(read_ideas(args.ideas, args.format), args.dest, max(1, args.workers), journal=journal,
+                                 stream=args.stream, use_cache=not args.no_cache,
+                                 refresh=args.refresh_cache, reuse_similar=not args.no_reuse_similar,
+                                 split=args.split, templates=not args.ai_boilerplate,
+                                 json_mode=not args.free_form_json, use_api=args.github_api, fsync=args.fsync)
+    print_report(results, elapsed)
+    if journal is not None:
+        resumed = sum(1 for r in results if r.get("resumed"))
+        log_line(f"📒 {resumed} jobs already finished in an earlier run; journal now {journal.counts()}")
+        journal.close()
+    log_line(f"📈 Stage timings written to {registry.export(args.metrics_dir)}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({"seconds": round(elapsed, 2), "jobs": results}, f, indent=2)
+
+    return 0 if all(r["status"] == "created" for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
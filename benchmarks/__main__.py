@@ -0,0 +1,106 @@
+"""Run the benchmark suite against the fake model and fake gh.
+
+    python -m benchmarks                      # compare with benchmarks/baselines.json
+    python -m benchmarks --update-baseline    # record the current numbers
+    python -m benchmarks --only micro --threshold 0.10 --rounds 5
+
+Every metric is seconds (lower is better), stored and compared as a
+multiple of a reference workload timed in the same run: fixed CPU, file
+and process-spawn loops for the micro benchmarks, the fake model's
+median latency for end to end. The suite runs --rounds times and each
+metric takes its median. A metric fails when it is more than --threshold
+plus its own spread across rounds slower than the baseline, or has no
+baseline at all; record one with --update-baseline.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+from benchmarks import e2e, micro
+from benchmarks.fake_model import FakeModel
+from benchmarks.harness import references, sandbox
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+def reference_for(name):
+    return e2e.REFERENCE if name.startswith("e2e.") else micro.REFERENCES[name]
+
+def compare(results, baseline, threshold, noise=None):
+    """Print every metric against its baseline; return (regressions, metrics without a baseline)"""
+    regressions, unknown = [], []
+    noise = noise or {}
+    for name, value in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None:
+            unknown.append(name)
+            print(f"❔ {name:<40} {value:>10.3f} x ref  (no baseline)")
+            continue
+        change = (value - before) / before if before else 0.0
+        allowed = threshold + noise.get(name, 0.0)
+        slower = change > allowed
+        if slower:
+            regressions.append(name)
+        print(f"{'❌' if slower else '✅'} {name:<40} {value:>10.3f} x ref  "
+              f"({change:+.1%} vs {before:.3f}, allowed {allowed:+.0%})")
+    return regressions, unknown
+
+def run_round(root, args, n=0):
+    """One pass over the selected suites; return each metric divided by its reference"""
+    os.makedirs(root)
+    measured = {}
+    if args.only in (None, "micro"):
+        print("⏱️ Micro benchmarks")
+        measured.update(micro.run(root))
+    if args.only in (None, "e2e"):
+        print("⏱️ End-to-end benchmarks")
+        measured.update(e2e.run(root, args.concurrency, tag=f"r{n}-"))
+    scale = dict(references(root), **{e2e.REFERENCE: args.median})
+    return {name: value / scale[reference_for(name)] for name, value in measured.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline benchmarks with a fake Gemini backend and fake gh")
+    parser.add_argument("--only", choices=["micro", "e2e"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(e2e.CONCURRENCY))
+    parser.add_argument("--latency", choices=["constant", "uniform", "lognormal"], default="constant")
+    parser.add_argument("--median", type=float, default=0.05, help="median fake model latency in seconds")
+    parser.add_argument("--rounds", type=int, default=3, help="times the suite runs; each metric takes the median")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    rounds = []
+    with sandbox(FakeModel(latency=args.latency, median=args.median, high=args.median * 2, seed=7)) as root:
+        for n in range(max(1, args.rounds)):
+            rounds.append(run_round(os.path.join(root, f"round-{n}"), args, n))
+
+    results, noise = {}, {}
+    for name in rounds[0]:
+        values = [r[name] for r in rounds]
+        results[name] = statistics.median(values)
+        # a metric that moved this much between our own rounds cannot be judged more finely
+        noise[name] = (max(values) - min(values)) / results[name] if results[name] else 0.0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    regressions, unknown = compare(results, baseline, args.threshold, noise)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+    if unknown:
+        print(f"❌ {len(unknown)} benchmark(s) have no baseline in {args.baseline}; record them with --update-baseline")
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) slower than baseline beyond threshold and noise")
+    return 1 if regressions or unknown else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
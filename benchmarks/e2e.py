@@ -0,0 +1,28 @@
+import os
+
+from batch import run_batch
+
+CONCURRENCY = (1, 8, 64)
+# end-to-end time is mostly the fake model sleeping, so it is stored as a multiple of that
+REFERENCE = "reference.model_latency"
+
+def silent(message):
+    pass
+
+def run(root, concurrency=CONCURRENCY, jobs_per_worker=2, min_jobs=8, log=print, tag=""):
+    # tag keeps repository names unique when one sandbox runs the suite several times
+    results = {}
+    for workers in concurrency:
+        jobs = max(min_jobs, workers * jobs_per_worker)
+        ideas = [f"benchmark idea {tag}{workers}-{i}: a small command line tool number {i}" for i in range(jobs)]
+        dest = os.path.join(root, f"e2e-{workers}")
+        os.makedirs(dest)
+        jobs_done, elapsed = run_batch(iter(ideas), dest, workers, log=silent,
+                                       use_cache=False, reuse_similar=False)
+        failed = [r for r in jobs_done if r["status"] != "created"]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {jobs} jobs failed at {workers} workers: {failed[0]['error']}")
+        per_repo = elapsed / jobs
+        log(f"   {workers:>3} workers: {jobs} repos in {elapsed:.2f}s ({60 / per_repo:.1f} repos/minute)")
+        results[f"e2e.workers_{workers}.seconds_per_repo"] = per_repo
+    return results
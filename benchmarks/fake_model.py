@@ -0,0 +1,88 @@
+"""Stand-in for genai.GenerativeModel that answers with canned JSON.
+
+Latency is drawn per request from a configurable distribution so the
+pipeline can be measured without network access or quota:
+
+    from benchmarks.fake_model import FakeModel
+    from ai.generator import set_model
+    set_model(FakeModel(latency="lognormal", median=0.8, sigma=0.5))
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+README_PARAGRAPH = ("This project was scaffolded for benchmarking. It describes installation, "
+                    "usage, configuration and contribution guidelines in enough detail to look "
+                    "like a real README generated by the model.\n\n")
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    def __init__(self, latency="constant", median=0.05, sigma=0.3, low=0.0, high=0.1,
+                 readme_kb=8, chunk_size=256, seed=None, fenced=True):
+        self.latency = latency
+        self.median = median
+        self.sigma = sigma
+        self.low = low
+        self.high = high
+        self.readme_kb = readme_kb
+        self.chunk_size = chunk_size
+        self.fenced = fenced
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            self.calls += 1
+            if self.latency == "uniform":
+                return self._rng.uniform(self.low, self.high)
+            if self.latency == "lognormal":
+                return self._rng.lognormvariate(math.log(self.median), self.sigma)
+            return self.median
+
+    def payload(self, prompt):
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        readme = "# Benchmark repository\n\n" + README_PARAGRAPH * max(1, self.readme_kb * 1024 // len(README_PARAGRAPH))
+        data = {
+            "repo_name": f"bench-repo-{digest}",
+            "description": "Repository generated by the fake benchmark model",
+            "readme": readme,
+            "gitignore": "__pycache__/\n*.py[cod]\n.venv/\n",
+            "license_text": "MIT License\n\nCopyright (c) 2024\n",
+            "requirements": "requests\n",
+        }
+        # mimic a model that was asked for a subset of fields
+        wanted = [key for key in data if f'"{key}"' in prompt] or list(data)
+        text = json.dumps({key: data[key] for key in wanted}, indent=2)
+        return f"```json\n{text}\n```" if self.fenced else text
+
+    def _text(self, prompt, generation_config=None):
+        text = self.payload(prompt)
+        if (generation_config or {}).get("response_mime_type") == "application/json" and text.startswith("```"):
+            # JSON mode never wraps the answer in a code fence
+            text = text.split('\n', 1)[1].rsplit('\n', 1)[0]
+        return text
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        time.sleep(self.delay())
+        text = self._text(prompt, generation_config)
+        if stream:
+            return [FakeResponse(text[i:i + self.chunk_size]) for i in range(0, len(text), self.chunk_size)]
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt, generation_config=None, **kwargs):
+        await asyncio.sleep(self.delay())
+        return FakeResponse(self._text(prompt, generation_config))
+
+    def count_tokens(self, *args, **kwargs):
+        return 1
+
+    async def count_tokens_async(self, *args, **kwargs):
+        return 1
@@ -0,0 +1,70 @@
+import itertools
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+from ai.generator import set_model
+from benchmarks.fake_model import FakeModel
+
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin")
+
+@contextmanager
+def sandbox(model=None):
+    """Point every cache, the gh binary and the AI model at throwaway stand-ins.
+
+    Must be entered before the pipeline first touches its caches, since
+    those read their locations from the environment once.
+    """
+    root = tempfile.mkdtemp(prefix="ai-repo-bench-")
+    saved = dict(os.environ)
+    os.environ.update({
+        "PATH": BIN_DIR + os.pathsep + os.environ.get("PATH", ""),
+        "FAKE_GH_REMOTES": os.path.join(root, "remotes"),
+        "ai_repo_cache_dir": os.path.join(root, "cache"),
+        "ai_repo_similarity_index": os.path.join(root, "similar.jsonl"),
+        "ai_repo_preflight_path": os.path.join(root, "preflight.json"),
+    })
+    set_model(model or FakeModel())
+    try:
+        yield root
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+        shutil.rmtree(root, ignore_errors=True)
+
+def measure(fn, number=1, repeat=5, setup=None):
+    """Median seconds per call of fn over repeat rounds of number calls"""
+    rounds = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number)
+    return statistics.median(rounds)
+
+def references(root):
+    """Seconds for fixed CPU, file and process workloads on this machine, measured now.
+
+    Micro benchmarks are stored as multiples of one of these, so a
+    baseline recorded on a fast laptop still holds on a slow CI runner.
+    """
+    targets = (os.path.join(root, f"reference-files-{n}") for n in itertools.count())
+
+    def write_files():
+        target = next(targets)
+        os.makedirs(target)
+        for i in range(50):
+            with open(os.path.join(target, f"f{i}.txt"), "w", encoding="utf-8") as f:
+                f.write("reference\n" * 20)
+
+    return {
+        "reference.python": measure(lambda: sorted(str(i * 7919 % 10007) for i in range(20000)), number=10),
+        "reference.files": measure(write_files, number=10),
+        "reference.spawn": measure(lambda: subprocess.run(["git", "--version"], capture_output=True), number=10),
+    }
@@ -0,0 +1,46 @@
+import itertools
+import os
+
+from ai.generator import parse_response
+from ai.json_extract import extract_object
+from benchmarks.fake_model import FakeModel
+from benchmarks.harness import measure
+from file_manager.creator import create_files
+from file_manager.github_utils import run_command
+from file_manager.materializer import materialize
+
+# the machine-speed reference each metric is divided by, see harness.references
+REFERENCES = {
+    "micro.parse_response": "reference.python",
+    "micro.extract_object_128kb": "reference.python",
+    "micro.extract_object_truncated_128kb": "reference.python",
+    "micro.create_files": "reference.files",
+    "micro.materialize_1000_files": "reference.files",
+    "micro.run_command": "reference.spawn",
+}
+
+def silent(message):
+    pass
+
+def run(root):
+    model = FakeModel(readme_kb=16)
+    raw = model.payload("benchmark prompt")
+    data = parse_response(raw, silent)
+    # 100 KB+ answers: wrapped in a fence and prose, and cut off inside the README
+    large = FakeModel(readme_kb=128).payload("benchmark prompt")
+    wrapped = "Here is your repository:\n" + large + "\nLet me know if you need changes."
+    truncated = large[:len(large) * 3 // 4]
+    # a fresh folder per call, so no iteration only overwrites files the previous one made
+    targets = (os.path.join(root, f"micro-files-{n}") for n in itertools.count())
+    # a scaffold of 1000 small modules spread over 20 packages
+    tree = {f"src/pkg{i % 20}/mod{i}.py": f"# module {i}\n" * 10 for i in range(1000)}
+    trees = (os.path.join(root, f"micro-tree-{n}") for n in itertools.count())
+
+    return {
+        "micro.parse_response": measure(lambda: parse_response(raw, silent), number=200),
+        "micro.extract_object_128kb": measure(lambda: extract_object(wrapped), number=50),
+        "micro.extract_object_truncated_128kb": measure(lambda: extract_object(truncated), number=20),
+        "micro.create_files": measure(lambda: create_files(next(targets), data), number=100),
+        "micro.materialize_1000_files": measure(lambda: materialize(next(trees), tree), number=1, repeat=3),
+        "micro.run_command": measure(lambda: run_command(["git", "--version"]), number=10),
+    }
@@ -0,0 +1,100 @@
+"""Cold-start benchmark for the GUI.
+
+Each run starts a fresh interpreter and reports
+  import_ms       time to import gui.main_window
+  window_ms       time until the main window is mapped and drawn
+  interactive_ms  time until the AI SDK has finished loading in the background
+Medians over all runs are compared against the budgets; the exit code is
+1 when any budget is exceeded and 2 when no display is available.
+
+    python -m benchmarks.startup --runs 5 --budget-window-ms 800
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import gui.main_window as main_window
+t_import = time.perf_counter()
+try:
+    app = main_window.SingleClickRepoCreator()
+except Exception as e:
+    print(json.dumps({"error": str(e)}))
+    sys.exit(2)
+marks = {}
+
+def mapped(event=None):
+    if "window" not in marks:
+        app.root.update_idletasks()
+        marks["window"] = time.perf_counter()
+
+def poll():
+    if app.sdk_ready.is_set():
+        marks["interactive"] = time.perf_counter()
+    if "interactive" in marks or time.perf_counter() - t0 > TIMEOUT:
+        app.root.destroy()
+    else:
+        app.root.after(5, poll)
+
+app.root.bind("<Map>", mapped, add="+")
+app.root.after(5, poll)
+app.root.mainloop()
+ms = lambda t: None if t is None else round((t - t0) * 1000, 1)
+print(json.dumps({"import_ms": ms(t_import), "window_ms": ms(marks.get("window")),
+                  "interactive_ms": ms(marks.get("interactive"))}))
+'''
+
+METRICS = ("import_ms", "window_ms", "interactive_ms")
+
+def run_once(timeout):
+    proc = subprocess.run([sys.executable, "-c", CHILD.replace("TIMEOUT", str(timeout))],
+                          cwd=ROOT, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if not lines:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output"}
+    return json.loads(lines[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure GUI cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the SDK to load")
+    parser.add_argument("--budget-import-ms", type=float, default=300.0)
+    parser.add_argument("--budget-window-ms", type=float, default=1000.0)
+    parser.add_argument("--budget-interactive-ms", type=float, default=5000.0)
+    parser.add_argument("--json", help="write the raw runs and medians to this file")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for _ in range(args.runs):
+        result = run_once(args.timeout)
+        if "error" in result:
+            print(f"❌ Startup benchmark could not run: {result['error']}")
+            return 2
+        runs.append(result)
+
+    budgets = {"import_ms": args.budget_import_ms, "window_ms": args.budget_window_ms,
+               "interactive_ms": args.budget_interactive_ms}
+    medians = {}
+    failed = False
+    for metric in METRICS:
+        values = [r[metric] for r in runs if r[metric] is not None]
+        medians[metric] = statistics.median(values) if values else None
+        over = medians[metric] is None or medians[metric] > budgets[metric]
+        failed = failed or over
+        shown = "n/a" if medians[metric] is None else f"{medians[metric]:.1f} ms"
+        print(f"{'❌' if over else '✅'} {metric:<15} {shown:>10}  (budget {budgets[metric]:.0f} ms)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"runs": runs, "median": medians, "budget": budgets}, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,218 @@
 import os
+import posixpath
+import shutil
+import time
+import uuid
 
-def create_files(repo_path, data, log_callback=None):
-    files = {
-        'readme': 'README.md',
-        'gitignore': '.gitignore', 
-        'license_text': 'LICENSE',
-        'requirements': 'requirements.txt'
-    }
-    
-    for key, filename in files.items():
-        content = data.get(key, '')
-        if content and content.strip():
-            try:
-                with open(os.path.join(repo_path, filename), 'w', encoding='utf-8') as f:
-                    f.write(content)
-                if log_callback:
-                    log_callback(f"✅ Created: {filename}")
-            except Exception as e:
-                if log_callback:
-                    log_callback(f"❌ Failed to create {filename}: {str(e)}")
+from file_manager.materializer import materialize
+from file_manager.templates import template_files, with_templates
+from metrics.timing import span, increment
+
+FILES = {
+    'readme': 'README.md',
+    'gitignore': '.gitignore',
+    'license_text': 'LICENSE',
+    'requirements': 'requirements.txt'
+}
+
+# none: leave it to the OS; per-file: fsync each file as it is written; batch: fsync them all once everything is written
+FSYNC_POLICIES = ("none", "per-file", "batch")
+
+# a scaffold bigger than this is summarised in the log instead of listed file by file
+MAX_LISTED_FILES = 20
+
+def default_fsync():
+    policy = os.getenv("ai_repo_fsync", "none")
+    return policy if policy in FSYNC_POLICIES else "none"
+
+def create_files(repo_path, data, log_callback=None, fsync=None, staged=False, idea=None):
+    """Write the artifacts in data into repo_path all or nothing; return whether it worked.
+
+    staged=True means repo_path is already a private staging directory that
+    the caller renames into place, so files are written straight into it.
+    idea, the text the user typed, helps choose the .gitignore template.
+    """
+    # LICENSE and .gitignore the AI did not write come from the local template store
+    with span("files.create"):
+        return _write_files(repo_path, with_templates(data, idea), log_callback, fsync or default_fsync(), staged)
+
+def write_templates(repo_path, data, log_callback=None, fsync=None, idea=None):
+    """Write only the template files for artifacts missing from data"""
+    missing = template_files(data, idea)
+    if not missing:
+        return True
+    return _write_files(repo_path, missing, log_callback, fsync or default_fsync())
+
+def sync_files(root, paths):
+    # only what we wrote: os.sync() would wait for every dirty page of every disk on the machine
+    for path in paths:
+        with open(os.path.join(root, *path.split('/')), 'rb+') as f:
+            os.fsync(f.fileno())
+
+def sync_directories(root, paths):
+    """fsync root and every directory under it that holds one of paths, deepest first"""
+    dirs = set()
+    for path in paths:
+        parent = posixpath.dirname(path)
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = posixpath.dirname(parent)
+    for rel_dir in sorted(dirs, key=lambda d: -d.count('/')):
+        _sync_directory(os.path.join(root, *rel_dir.split('/')))
+    _sync_directory(root)
+
+def _sync_directory(path):
+    # makes the renames themselves durable; directories cannot be opened this way on Windows
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _publish(staging, repo_path, paths):
+    if not os.path.exists(repo_path):
+        # the whole tree appears at once
+        os.rename(staging, repo_path)
+        return
+    for path in paths:
+        target = os.path.join(repo_path, *path.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(os.path.join(staging, *path.split('/')), target)
+    shutil.rmtree(staging, ignore_errors=True)
+
+def _write_files(repo_path, data, log_callback, fsync, staged=False):
+    manifest = {filename: data[key] for key, filename in FILES.items() if (data.get(key) or '').strip()}
+    # any further files come as a {relative path: content} mapping
+    if isinstance(data.get('files'), dict):
+        manifest.update(data['files'])
+    return write_manifest(repo_path, manifest, log_callback, fsync, staged)
+
+def write_manifest(repo_path, manifest, log_callback=None, fsync=None, staged=False):
+    """Materialize a {relative path: content} manifest into a staging directory, then move it into place.
+
+    Contents may be str, bytes or iterables of chunks (see materializer).
+    A failure leaves repo_path exactly as it was, so a later 'git add .'
+    can never pick up a half-written scaffold.
+    """
+    fsync = fsync or default_fsync()
+    if not manifest:
+        os.makedirs(repo_path, exist_ok=True)
+        return True
+    repo_path = os.path.abspath(repo_path)
+    parent = os.path.dirname(repo_path)
+    staging = repo_path
+    if not staged:
+        staging = os.path.join(parent, f".{os.path.basename(repo_path)}.staging-{uuid.uuid4().hex[:12]}")
+    started = time.perf_counter()
+    try:
+        os.makedirs(staging, exist_ok=staged)
+        paths, total = materialize(staging, manifest, sync=fsync == "per-file")
+        if fsync == "batch":
+            sync_files(staging, paths)
+        if not staged:
+            _publish(staging, repo_path, paths)
+        if fsync != "none":
+            sync_directories(repo_path, paths)
+            _sync_directory(parent)
+    except Exception as e:
+        if not staged:
+            shutil.rmtree(staging, ignore_errors=True)
+        if log_callback:
+            log_callback(f"❌ Failed to create files: {str(e)}")
+        return False
+    elapsed = time.perf_counter() - started
+    increment("files.bytes", total)
+    if log_callback:
+        if len(paths) <= MAX_LISTED_FILES:
+            for path in paths:
+                log_callback(f"✅ Created: {path}")
+        rate = total / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        log_callback(f"💾 Wrote {len(paths)} files ({total / 1024:.1f} KB) in {elapsed * 1000:.1f} ms ({rate:.1f} MB/s)")
+    return True
+
+class StreamingFileWriter:
+    """Writes artifacts to disk while their JSON fields are still arriving.
+
+    Chunks are buffered only until the repository path is known and the
+    field has some non-whitespace content, then go straight to the file.
+    The path is meant to be a staging folder the caller renames into
+    place afterwards; written lists the files completed so far.
+    """
+
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback
+        self.repo_path = None
+        self.fields = {}
+        self.written = []
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def set_repo_path(self, repo_path):
+        self.repo_path = repo_path
+        for key, field in self.fields.items():
+            if field["has_text"] and field["file"] is None and not field["failed"]:
+                self._open(key, field)
+                if field["closed"]:
+                    self._close(key, field)
+
+    def handle(self, event, key, data):
+        if key not in FILES:
+            return
+        if event == "start":
+            self.fields[key] = {"buffer": [], "file": None, "has_text": False, "closed": False, "failed": False}
+            self._log(f"📝 Receiving {FILES[key]}...")
+            return
+        field = self.fields[key]
+        if field["failed"]:
+            return
+        if event == "chunk":
+            if field["file"] is not None:
+                self._write(key, field, data)
+                return
+            field["buffer"].append(data)
+            if not field["has_text"] and data.strip():
+                field["has_text"] = True
+            if field["has_text"] and self.repo_path is not None:
+                self._open(key, field)
+        elif event == "end":
+            field["closed"] = True
+            if field["file"] is not None:
+                self._close(key, field)
+
+    def _open(self, key, field):
+        try:
+            field["file"] = open(os.path.join(self.repo_path, FILES[key]), 'w', encoding='utf-8')
+        except Exception as e:
+            field["failed"] = True
+            self._log(f"❌ Failed to create {FILES[key]}: {str(e)}")
+            return
+        buffered, field["buffer"] = field["buffer"], []
+        self._write(key, field, ''.join(buffered))
+
+    def _write(self, key, field, text):
+        if field["failed"]:
+            return
+        try:
+            field["file"].write(text)
+        except Exception as e:
+            field["failed"] = True
+            self._log(f"❌ Failed to create {FILES[key]}: {str(e)}")
+
+    def _close(self, key, field):
+        f, field["file"] = field["file"], None
+        if f is None:
+            return
+        f.close()
+        if not field["failed"]:
+            self.written.append(FILES[key])
+            self._log(f"✅ Created: {FILES[key]}")
+
+    def close(self):
+        for key, field in self.fields.items():
+            if field["file"] is not None:
+                field["file"].close()
+                field["file"] = None
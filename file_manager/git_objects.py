@@ -0,0 +1,407 @@
+import hashlib
+import os
+import re
+import shutil
+import struct
+import sys
+import time
+import zlib
+
+DEFAULT_NAME = "AI Repo Creator"
+DEFAULT_EMAIL = "ai@example.com"
+# the raw '<unix seconds> <+hhmm>' form of GIT_AUTHOR_DATE / GIT_COMMITTER_DATE
+_RAW_DATE = re.compile(r'@?(\d+) ([+-]\d{4})$')
+
+def _truthy(value):
+    return (value or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _system_config(strict=True):
+    if _truthy(os.getenv("GIT_CONFIG_NOSYSTEM")):
+        return []
+    if os.getenv("GIT_CONFIG_SYSTEM"):
+        return [os.getenv("GIT_CONFIG_SYSTEM")]
+    git = shutil.which("git")
+    if sys.platform.startswith("linux") and (git is None or os.path.realpath(git).startswith("/usr/bin/")):
+        return ["/etc/gitconfig"]
+    if not strict:
+        return []
+    # Git for Windows, Apple's and Homebrew's git each keep it under their own prefix
+    raise NeedsGit("system git config location is not known on this platform")
+
+def _config_files(strict=True):
+    home = os.path.expanduser("~")
+    xdg = os.getenv("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+    if os.getenv("GIT_CONFIG_GLOBAL"):
+        return _system_config(strict) + [os.getenv("GIT_CONFIG_GLOBAL")]
+    return _system_config(strict) + [os.path.join(xdg, "git", "config"), os.path.join(home, ".gitconfig")]
+
+def _unquote(value):
+    value = value.split(' #')[0].split(' ;')[0].strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return value.replace('\\"', '"').replace('\\\\', '\\')
+
+def read_config(paths, strict=True):
+    values = {}
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        section = ''
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line.startswith('['):
+                header = line[1:line.index(']')] if ']' in line else line[1:]
+                name, _, sub = header.partition(' ')
+                section = name.lower() + ('.' + sub.strip().strip('"') if sub else '')
+                if strict and name.lower() in ('include', 'includeif'):
+                    raise NeedsGit(f"{path} includes other config files")
+                continue
+            key, sep, value = line.partition('=')
+            values[f"{section}.{key.strip().lower()}"] = _unquote(value) if sep else 'true'
+    return values
+
+def global_config(strict=True):
+    # strict=False reads what it can instead of raising NeedsGit, for lookups that only want a hint
+    return read_config(_config_files(strict), strict)
+
+def hash_object(kind, body):
+    data = kind.encode() + b' ' + str(len(body)).encode() + b'\0' + body
+    return hashlib.sha1(data).hexdigest(), data
+
+class NeedsGit(Exception):
+    """The repository uses something this module does not read (packs, packed refs, config includes, symlinks, ...)"""
+
+def _wildmatch(pattern):
+    """Compile a gitignore glob the way git's wildmatch reads it: '*' and '?' stop at '/', '**' spans directories"""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            j = i
+            while j < n and pattern[j] == '*':
+                j += 1
+            if j - i == 2 and (i == 0 or pattern[i - 1] == '/') and (j == n or pattern[j] == '/'):
+                if j == n:
+                    out.append('.*')
+                else:
+                    # '**/' also matches no directory at all
+                    out.append('(?:.*/)?')
+                    j += 1
+            else:
+                out.append('[^/]*')
+            i = j
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        elif c == '[':
+            j = i + 1
+            negate = j < n and pattern[j] in '!^'
+            if negate:
+                j += 1
+            close = pattern.find(']', j + 1)
+            if close < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[j:close]
+                if '[:' in body or '\\' in body:
+                    raise NeedsGit(f"unsupported character class in ignore pattern {pattern!r}")
+                body = ''.join('\\' + ch if ch in '\\[]^' else ch for ch in body)
+                out.append(f"[^/{body}]" if negate else f"[{body}]")
+                i = close + 1
+                continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile(''.join(out), re.DOTALL)
+
+def _parse_ignore(text, base):
+    rules = []
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # a slash anywhere but at the end ties the pattern to the directory of its .gitignore
+        anchored = '/' in line
+        rules.append((base, _wildmatch(line.lstrip('/')), negate, dir_only, anchored))
+    return rules
+
+class _Ignore:
+    """git's exclude rules: core.excludesFile, info/exclude, then every .gitignore from the root down.
+
+    Rules are checked in that order and the last match wins, which gives
+    deeper .gitignore files precedence like git does. Directories are
+    loaded as the walk enters them.
+    """
+
+    def __init__(self, repo_path, config):
+        self.repo_path = repo_path
+        self.rules = []
+        xdg = os.getenv("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        excludes = config.get("core.excludesfile") or os.path.join(xdg, "git", "ignore")
+        for path in (os.path.expanduser(excludes), os.path.join(repo_path, '.git', 'info', 'exclude')):
+            self._read(path, '')
+
+    def _read(self, path, base):
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                self.rules.extend(_parse_ignore(f.read(), base))
+        except OSError:
+            pass
+
+    def load(self, rel_dir):
+        # rel_dir is '' for the root, otherwise 'a/b/'
+        self._read(os.path.join(self.repo_path, *rel_dir.split('/'), '.gitignore'), rel_dir)
+
+    def ignored(self, rel_path, is_dir):
+        result = False
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if (dir_only and not is_dir) or not rel_path.startswith(base):
+                continue
+            target = rel_path[len(base):]
+            if regex.fullmatch(target if anchored else target.rsplit('/', 1)[-1]):
+                result = not negate
+        return result
+
+class CommitBuilder:
+    """Creates a repository and commits the working tree without running git.
+
+    Produces the same object ids as ``git init && git add . && git commit``
+    for the same files, identity and timestamp, and writes a matching
+    index so the working tree shows up clean.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self.git_dir = os.path.join(repo_path, '.git')
+        self.config = global_config()
+
+    def local_config(self):
+        return dict(self.config, **read_config([os.path.join(self.git_dir, 'config')]))
+
+    def identity(self):
+        # only the config counts here, like the 'git config user.name' check of the git fallback
+        config = self.local_config()
+        name = config.get("user.name")
+        email = config.get("user.email")
+        missing = {}
+        if not name:
+            name = missing["name"] = DEFAULT_NAME
+        if not email:
+            email = missing["email"] = DEFAULT_EMAIL
+        return name, email, missing
+
+    def person(self, role, timestamp):
+        """'Name <email> seconds +hhmm' for role 'author' or 'committer', with git's env and config precedence"""
+        config = self.local_config()
+        env = role.upper()
+        name = os.getenv(f"GIT_{env}_NAME") or config.get(f"{role}.name") or config.get("user.name") or DEFAULT_NAME
+        email = os.getenv(f"GIT_{env}_EMAIL") or config.get(f"{role}.email") or config.get("user.email") or DEFAULT_EMAIL
+        date = os.getenv(f"GIT_{env}_DATE")
+        if date:
+            match = _RAW_DATE.match(date.strip())
+            if not match:
+                raise NeedsGit(f"GIT_{env}_DATE is not in '<seconds> <+hhmm>' form")
+            return f"{name} <{email}> {match.group(1)} {match.group(2)}"
+        offset = time.localtime(timestamp).tm_gmtoff // 60
+        tz = f"{'+' if offset >= 0 else '-'}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
+        return f"{name} <{email}> {timestamp} {tz}"
+
+    def branch(self):
+        return self.config.get("init.defaultbranch") or "master"
+
+    def head_ref(self):
+        try:
+            with open(os.path.join(self.git_dir, 'HEAD'), encoding='utf-8') as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        return head[5:].strip() if head.startswith('ref:') else None
+
+    def head_commit(self):
+        """sha of the commit HEAD points at, or None for an unborn branch"""
+        ref = self.head_ref()
+        if not ref:
+            raise NeedsGit("detached HEAD")
+        try:
+            with open(os.path.join(self.git_dir, *ref.split('/')), encoding='utf-8') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            if os.path.exists(os.path.join(self.git_dir, 'packed-refs')):
+                raise NeedsGit("packed refs")
+            return None
+
+    def read_object(self, sha):
+        try:
+            with open(os.path.join(self.git_dir, 'objects', sha[:2], sha[2:]), 'rb') as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            raise NeedsGit(f"object {sha} is not loose")
+        header, _, body = data.partition(b'\0')
+        return header.split(b' ', 1)[0].decode(), body
+
+    def commit_tree(self, sha):
+        kind, body = self.read_object(sha)
+        if kind != 'commit' or not body.startswith(b'tree '):
+            raise NeedsGit(f"{sha} is not a commit")
+        return body[5:45].decode()
+
+    def init(self):
+        if os.path.exists(os.path.join(self.git_dir, 'HEAD')):
+            return
+        for sub in ('objects/info', 'objects/pack', 'refs/heads', 'refs/tags', 'hooks', 'info'):
+            os.makedirs(os.path.join(self.git_dir, *sub.split('/')), exist_ok=True)
+        core = "[core]\n\trepositoryformatversion = 0\n\tfilemode = {}\n\tbare = false\n\tlogallrefupdates = true\n"
+        if os.name == 'nt':
+            core = core.format('false') + "\tsymlinks = false\n\tignorecase = true\n"
+        else:
+            core = core.format('true')
+        files = {
+            'HEAD': f"ref: refs/heads/{self.branch()}\n",
+            'config': core,
+            'description': "Unnamed repository; edit this file 'description' to name the repository.\n",
+            'info/exclude': "# git ls-files --others --exclude-from=.git/info/exclude\n",
+        }
+        for name, content in files.items():
+            with open(os.path.join(self.git_dir, *name.split('/')), 'w', encoding='utf-8', newline='\n') as f:
+                f.write(content)
+
+    def set_identity(self, missing):
+        lines = ''.join(f"\t{key} = {value}\n" for key, value in missing.items())
+        with open(os.path.join(self.git_dir, 'config'), 'a', encoding='utf-8', newline='\n') as f:
+            f.write(f"[user]\n{lines}")
+
+    def write_object(self, kind, body):
+        sha, data = hash_object(kind, body)
+        path = os.path.join(self.git_dir, 'objects', sha[:2], sha[2:])
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(zlib.compress(data))
+            os.replace(tmp, path)
+        return sha
+
+    def collect(self):
+        ignore = _Ignore(self.repo_path, self.local_config())
+        entries = []
+        for root, dirs, files in os.walk(self.repo_path):
+            rel_root = os.path.relpath(root, self.repo_path).replace(os.sep, '/')
+            rel_root = '' if rel_root == '.' else rel_root + '/'
+            ignore.load(rel_root)
+            dirs[:] = sorted(d for d in dirs if d != '.git' and not ignore.ignored(rel_root + d, True))
+            for name in dirs:
+                if os.path.islink(os.path.join(root, name)):
+                    raise NeedsGit(f"{rel_root + name} is a symlink")
+            for name in files:
+                rel = rel_root + name
+                full = os.path.join(root, name)
+                if ignore.ignored(rel, False):
+                    continue
+                if os.path.islink(full):
+                    # git stores the link itself (mode 120000), which this module does not write
+                    raise NeedsGit(f"{rel} is a symlink")
+                st = os.stat(full)
+                mode = 0o100755 if os.name != 'nt' and st.st_mode & 0o111 else 0o100644
+                with open(full, 'rb') as f:
+                    sha = self.write_object('blob', f.read())
+                entries.append((rel, mode, sha, st))
+        entries.sort(key=lambda e: e[0].encode('utf-8'))
+        return entries
+
+    def write_tree(self, entries, prefix=''):
+        children, subdirs = [], {}
+        for rel, mode, sha, _ in entries:
+            rest = rel[len(prefix):]
+            if '/' in rest:
+                subdirs.setdefault(rest.split('/', 1)[0], []).append((rel, mode, sha, None))
+            else:
+                children.append((rest, f"{mode:o}", sha))
+        for name, sub_entries in subdirs.items():
+            children.append((name, "40000", self.write_tree(sub_entries, prefix + name + '/')))
+        # git orders tree entries as if directory names had a trailing slash
+        children.sort(key=lambda c: (c[0] + '/' if c[1] == "40000" else c[0]).encode('utf-8'))
+        body = b''.join(f"{mode} {name}".encode('utf-8') + b'\0' + bytes.fromhex(sha) for name, mode, sha in children)
+        return self.write_object('tree', body)
+
+    def write_index(self, entries):
+        data = [b'DIRC', struct.pack('>II', 2, len(entries))]
+        for rel, mode, sha, st in entries:
+            path = rel.encode('utf-8')
+            fields = (int(st.st_ctime), st.st_ctime_ns % 1000000000, int(st.st_mtime), st.st_mtime_ns % 1000000000,
+                      st.st_dev, st.st_ino, mode, st.st_uid, st.st_gid, st.st_size)
+            entry = struct.pack('>10I', *(v & 0xffffffff for v in fields)) + bytes.fromhex(sha)
+            entry += struct.pack('>H', min(len(path), 0xfff)) + path
+            entry += b'\0' * (8 - (len(entry) % 8))
+            data.append(entry)
+        body = b''.join(data)
+        with open(os.path.join(self.git_dir, 'index'), 'wb') as f:
+            f.write(body + hashlib.sha1(body).digest())
+
+    def commit(self, message, timestamp=None):
+        """Commit the working tree on top of HEAD; return the new sha, HEAD's if nothing changed, None if empty"""
+        self.init()
+        _, _, missing = self.identity()
+        if missing:
+            self.set_identity(missing)
+        parent = self.head_commit()
+        entries = self.collect()
+        if not entries:
+            return None
+        tree = self.write_tree(entries)
+        if parent and self.commit_tree(parent) == tree:
+            # a retry of an earlier run finds everything already committed
+            self.write_index(entries)
+            return parent
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        author, committer = self.person('author', timestamp), self.person('committer', timestamp)
+        message = message.rstrip() + '\n'
+        parent_line = f"parent {parent}\n" if parent else ''
+        body = f"tree {tree}\n{parent_line}author {author}\ncommitter {committer}\n\n{message}".encode('utf-8')
+        sha = self.write_object('commit', body)
+
+        ref = self.head_ref() or f"refs/heads/{self.branch()}"
+        ref_path = os.path.join(self.git_dir, *ref.split('/'))
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        with open(ref_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(sha + '\n')
+        action = "commit" if parent else "commit (initial)"
+        log_line = f"{parent or '0' * 40} {sha} {committer}\t{action}: {message.splitlines()[0]}\n"
+        for log in ('HEAD', ref):
+            log_path = os.path.join(self.git_dir, 'logs', *log.split('/'))
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            with open(log_path, 'a', encoding='utf-8', newline='\n') as f:
+                f.write(log_line)
+        self.write_index(entries)
+        return sha
+
+def prepare_repository(repo_path):
+    # everything 'git init' plus identity setup does, so it can run before the files exist
+    builder = CommitBuilder(repo_path)
+    builder.init()
+    _, _, missing = builder.identity()
+    if missing:
+        builder.set_identity(missing)
+
+def commit_initial(repo_path, message, timestamp=None):
+    # a folder reused by a later idea gets its changes committed on top; an unchanged one is left alone
+    sha = CommitBuilder(repo_path).commit(message, timestamp)
+    return sha is not None, sha
@@ -0,0 +1,136 @@
+import base64
+import http.client
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+from file_manager.github_utils import run_command
+
+API_URL = "https://api.github.com"
+
+class GitHubAPIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+
+class GitHubClient:
+    """Keep-alive client for the handful of GitHub REST calls the pipeline makes.
+
+    Every thread keeps its own persistent connection, so a worker pool
+    reuses one TLS session per worker instead of launching gh per call.
+    base_url can point at a local mock server.
+    """
+
+    def __init__(self, token=None, base_url=None, timeout=30):
+        self.base_url = (base_url or os.getenv("ai_repo_github_api") or API_URL).rstrip('/')
+        parts = urlsplit(self.base_url)
+        self._https = parts.scheme == 'https'
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path
+        self._timeout = timeout
+        self._token = token
+        self._token_lock = threading.Lock()
+        self._local = threading.local()
+        self._login = None
+
+    def token(self):
+        if self._token is None:
+            with self._token_lock:
+                if self._token is None:
+                    token = os.getenv("GH_TOKEN") or os.getenv("GITHUB_TOKEN")
+                    if not token:
+                        success, stdout, _ = run_command(["gh", "auth", "token"])
+                        token = stdout.strip() if success else ''
+                    self._token = token
+        return self._token
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            conn = cls(self._host, self._port, timeout=self._timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def request(self, method, path, body=None):
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "ai-repo-creator",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "Connection": "keep-alive",
+        }
+        if self.token():
+            headers["Authorization"] = f"Bearer {self.token()}"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request(method, self._prefix + path, body=payload, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError,
+                    http.client.CannotSendRequest, http.client.ResponseNotReady):
+                # the server closed an idle keep-alive connection; reconnect once
+                self._drop_connection()
+                if attempt == 2:
+                    raise
+        if response.getheader("Connection", "").lower() == "close":
+            self._drop_connection()
+        data = json.loads(raw) if raw else {}
+        if response.status >= 400:
+            message = data.get("message", "") if isinstance(data, dict) else str(data)
+            errors = data.get("errors") if isinstance(data, dict) else None
+            if errors:
+                message += ": " + "; ".join(e.get("message", str(e)) if isinstance(e, dict) else str(e) for e in errors)
+            raise GitHubAPIError(response.status, message)
+        return data
+
+    def get_user(self):
+        return self.request("GET", "/user")
+
+    def username(self):
+        if self._login is None:
+            self._login = self.get_user()["login"]
+        return self._login
+
+    def get_repo(self, owner, name):
+        return self.request("GET", f"/repos/{owner}/{name}")
+
+    def create_repo(self, name, description="", private=False):
+        repo = self.request("POST", "/user/repos", {"name": name, "description": description, "private": private})
+        self._login = repo.get("owner", {}).get("login") or self._login
+        return repo
+
+    def push_env(self):
+        # lets git push over https with the same token, without storing it anywhere; config passed
+        # through the environment stays out of the command line that ps and /proc/<pid>/cmdline show
+        if not self.token():
+            return {}
+        basic = base64.b64encode(f"x-access-token:{self.token()}".encode()).decode()
+        index = int(os.getenv("GIT_CONFIG_COUNT") or 0)
+        return {"GIT_CONFIG_COUNT": str(index + 1),
+                f"GIT_CONFIG_KEY_{index}": "http.extraHeader",
+                f"GIT_CONFIG_VALUE_{index}": f"Authorization: Basic {basic}"}
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_client():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = GitHubClient()
+    return _default
@@ -1,28 +1,41 @@
+import os
 import subprocess
-import threading
 
-def run_command(cmd, cwd=None, capture_output=True):
+from metrics.timing import span
+
+def command_stage(cmd):
+    # "git -c k=v push ..." -> "cmd.git.push", "gh repo create" -> "cmd.gh.repo"
+    args = iter(cmd[1:])
+    for arg in args:
+        if arg == "-c":
+            next(args, None)
+        elif not arg.startswith("-"):
+            return f"cmd.{cmd[0]}.{arg}"
+    return f"cmd.{cmd[0]}"
+
+def run_command(cmd, cwd=None, capture_output=True, env=None):
+    # env holds extra variables on top of the inherited environment
     try:
-        result = subprocess.run(cmd, cwd=cwd, capture_output=capture_output, 
-                              text=True, check=True)
+        with span(command_stage(cmd)):
+            result = subprocess.run(cmd, cwd=cwd, capture_output=capture_output, 
+                                  text=True, check=True, env=dict(os.environ, **env) if env else None)
         return True, result.stdout, result.stderr
     except subprocess.CalledProcessError as e:
         return False, e.stdout, e.stderr
     except Exception as e:
         return False, "", str(e)
 
-def check_github_cli(log_callback):
-    def check():
-        try:
-            subprocess.run(["gh", "--version"], check=True, capture_output=True)
-            subprocess.run(["gh", "auth", "status"], check=True, capture_output=True)
-            log_callback("✅ GitHub CLI ready!")
-        except:
-            log_callback("❌ GitHub CLI not ready. Please run 'gh auth login'")
-    threading.Thread(target=check, daemon=True).start()
+def check_github_cli(log_callback, refresh=False):
+    from file_manager.preflight import get_preflight
+    preflight = get_preflight()
+    if refresh:
+        preflight.results(refresh=True)
+    if preflight.github_ready():
+        log_callback("✅ GitHub CLI ready!")
+        return True
+    log_callback("❌ GitHub CLI not ready. Please run 'gh auth login'")
+    return False
 
 def get_username():
-    success, stdout, _ = run_command(["gh", "api", "user", "--jq", ".login"])
-    if success:
-        return stdout.strip()
-    return "user"
+    from file_manager.preflight import get_preflight
+    return get_preflight().username()
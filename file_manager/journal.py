@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "jobs.sqlite")
+
+# each state means that step has completed; a job resumes with the step after its state
+STATES = ("queued", "generated", "files_written", "committed", "published")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    idea TEXT NOT NULL,
+    state TEXT NOT NULL,
+    payload TEXT,
+    repo_name TEXT,
+    repo_path TEXT,
+    repo_url TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+def job_key(index, idea):
+    # position plus content, so the same ideas file maps onto the same rows on every run
+    return f"{index}:{hashlib.sha1(idea.encode('utf-8')).hexdigest()[:12]}"
+
+class Job:
+    """One journal row, handed to the pipeline so it can skip finished steps and checkpoint new ones"""
+
+    def __init__(self, journal, row):
+        self.journal = journal
+        self.job_id = row["job_id"]
+        self.idea = row["idea"]
+        self.state = row["state"]
+        self.payload = json.loads(row["payload"]) if row["payload"] else None
+        self.repo_name = row["repo_name"]
+        self.repo_path = row["repo_path"]
+        self.repo_url = row["repo_url"]
+        self.error = row["error"]
+        self.attempts = row["attempts"]
+
+    def reached(self, state):
+        return STATES.index(self.state) >= STATES.index(state)
+
+    @property
+    def done(self):
+        return self.state == STATES[-1]
+
+    def advance(self, state, payload=None, **fields):
+        self.journal.advance(self.job_id, state, payload, **fields)
+        self.state = state
+        if payload is not None:
+            self.payload = payload
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def fail(self, error):
+        self.journal.fail(self.job_id, error)
+        self.error = error
+
+class Journal:
+    """SQLite record of batch jobs and the last step each one completed.
+
+    The AI payload is stored once generated, so a crashed or interrupted
+    run picks every job up from its last step without paying for the AI
+    call again. WAL mode keeps checkpoints cheap and crash-safe.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # other processes may share the file (see work_queue), so wait out their write locks
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def open(self, job_id, idea):
+        """Return the Job for job_id, adding it as queued if this is its first run"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO jobs (job_id, idea, state, created, updated) VALUES (?, ?, ?, ?, ?)",
+                             (job_id, idea, STATES[0], now, now))
+            self._db.execute("UPDATE jobs SET attempts = attempts + 1 WHERE job_id = ?", (job_id,))
+            row = self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job(self, row)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job(self, row) if row else None
+
+    def advance(self, job_id, state, payload=None, **fields):
+        if state not in STATES:
+            raise ValueError(f"Unknown job state: {state}")
+        columns = {"state": state, "error": None, "updated": time.time()}
+        if payload is not None:
+            columns["payload"] = json.dumps(payload, ensure_ascii=False)
+        columns.update({name: fields[name] for name in ("repo_name", "repo_path", "repo_url") if name in fields})
+        assignments = ', '.join(f"{name} = ?" for name in columns)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*columns.values(), job_id))
+
+    def fail(self, job_id, error):
+        # the state stays at the last completed step, only the reason is kept
+        with self._lock:
+            self._db.execute("UPDATE jobs SET error = ?, updated = ? WHERE job_id = ?", (error, time.time(), job_id))
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
@@ -0,0 +1,85 @@
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+# below this many files the pool hand-off costs more than the writes themselves
+PARALLEL_MIN_FILES = 32
+FILES_PER_TASK = 64
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="materialize")
+
+class ManifestError(ValueError):
+    pass
+
+def normalize_path(rel_path):
+    """Manifest paths are '/'-separated, must stay inside the root and may not touch .git"""
+    path = posixpath.normpath(str(rel_path).replace('\\', '/'))
+    if path in ('', '.') or path.startswith(('/', '../')) or path == '..' or ':' in path.split('/', 1)[0]:
+        raise ManifestError(f"Invalid path in manifest: {rel_path!r}")
+    # Windows and macOS resolve '.GIT', '.git.' and the short name 'git~1' to the repository itself
+    if any(part.rstrip(' .').lower() in ('.git', 'git~1') for part in path.split('/')):
+        raise ManifestError(f"Manifest path inside .git: {rel_path!r}")
+    return path
+
+def plan(manifest):
+    """Turn a manifest (mapping or (path, content) pairs) into sorted entries and the directories they need"""
+    items = manifest.items() if hasattr(manifest, "items") else manifest
+    entries, dirs = [], set()
+    for rel_path, content in items:
+        path = normalize_path(rel_path)
+        parent = posixpath.dirname(path)
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = posixpath.dirname(parent)
+        entries.append((path, content))
+    # parents sort before their children, so each mkdir needs no existence checks further up
+    return entries, sorted(dirs, key=lambda d: (d.count('/'), d))
+
+def make_dirs(root, dirs):
+    os.makedirs(root, exist_ok=True)
+    for rel_dir in dirs:
+        try:
+            os.mkdir(os.path.join(root, *rel_dir.split('/')))
+        except FileExistsError:
+            pass
+
+def write_entry(root, rel_path, content, sync=False):
+    """Write str, bytes or an iterable of str/bytes chunks; return the number of bytes written"""
+    written = 0
+    with open(os.path.join(root, *rel_path.split('/')), 'wb') as f:
+        if isinstance(content, (str, bytes, bytearray, memoryview)):
+            content = (content,)
+        for chunk in content:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            written += f.write(chunk)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    return written
+
+def _write_batch(root, batch, sync):
+    return [write_entry(root, path, content, sync) for path, content in batch]
+
+def materialize(root, manifest, sync=False, parallel=None):
+    """Create every file of manifest under root; return (paths, total bytes).
+
+    Directories are created in one pass before any file is written.
+    Iterator contents are streamed chunk by chunk, so a large file never
+    has to exist in memory as a whole. Files are written on a thread pool
+    once there are enough of them to be worth it.
+    """
+    entries, dirs = plan(manifest)
+    make_dirs(root, dirs)
+    if parallel is None:
+        parallel = sync or len(entries) >= PARALLEL_MIN_FILES
+    if parallel and len(entries) > 1:
+        batches = [entries[i:i + FILES_PER_TASK] for i in range(0, len(entries), FILES_PER_TASK)]
+        if sync:
+            # fsync latency, not bytes, dominates: one file per task keeps every worker busy
+            batches = [[entry] for entry in entries]
+        sizes = [size for part in _executor.map(lambda batch: _write_batch(root, batch, sync), batches)
+                 for size in part]
+    else:
+        sizes = _write_batch(root, entries, sync)
+    return [path for path, _ in entries], sum(sizes)
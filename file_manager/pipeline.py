@@ -0,0 +1,457 @@
+import os
+import shutil
+import threading
+import uuid
+
+from ai.generator import generate_with_ai, generate_with_ai_stream, cached_response
+from file_manager.creator import (create_files, default_fsync, sync_directories, sync_files, write_templates,
+                                  StreamingFileWriter)
+from file_manager.git_objects import commit_initial, prepare_repository
+from file_manager.github_api import GitHubAPIError, get_client
+from file_manager.github_utils import run_command, get_username
+from file_manager.preflight import get_preflight, destination_writable, is_auth_error
+from file_manager.scheduler import Stage, StageCancelled, StageFailed, run_graph
+from metrics.timing import span, increment
+
+COMMIT_MESSAGE = "✨ Initial commit - repo created with AI"  #before changing this please star this repository thank you
+
+def clean_repo_name(name):
+    name = ''.join(c if c.isalnum() or c in '-_' else '-' for c in (name or ''))
+    name = name.strip('-_')
+    return name or 'AIRepo'
+
+def init_and_commit(repo_path, log_callback, in_process=True):
+    if in_process:
+        try:
+            with span("git.commit_in_process"):
+                success, _ = commit_initial(repo_path, COMMIT_MESSAGE)
+        except Exception as e:
+            log_callback(f"⚠️ In-process commit failed, falling back to git: {str(e)}")
+        else:
+            if not success:
+                return False, "No files available for commit"
+            return True, ""
+
+    success, _, stderr = run_command(["git", "init"], cwd=repo_path)
+    if not success:
+        return False, f"Git initialization failed: {stderr}"
+
+    success, _, _ = run_command(["git", "config", "user.name"], cwd=repo_path)
+    if not success:
+        log_callback("🔧 Configuring Git user settings...")
+        run_command(["git", "config", "user.name", "AI Repo Creator"], cwd=repo_path)
+        run_command(["git", "config", "user.email", "ai@example.com"], cwd=repo_path)
+
+    success, _, stderr = run_command(["git", "add", "."], cwd=repo_path)
+    if not success:
+        return False, f"Failed to stage files: {stderr}"
+
+    success, stdout, _ = run_command(["git", "status", "--porcelain"], cwd=repo_path)
+    if success and not stdout.strip():
+        # a retry of an earlier run finds everything already committed
+        committed, _, _ = run_command(["git", "rev-parse", "--verify", "HEAD"], cwd=repo_path)
+        if committed:
+            return True, ""
+    if not success or not stdout.strip():
+        return False, "No files available for commit"
+
+    success, _, stderr = run_command(["git", "commit", "-m", COMMIT_MESSAGE], cwd=repo_path)
+    if not success:
+        return False, f"Commit failed: {stderr}"
+    return True, ""
+
+def publish_repo(repo_path, repo_name, description, use_api=False):
+    if use_api:
+        return _publish_with_api(repo_path, repo_name, description)
+
+    success, _, stderr = run_command([
+        "gh", "repo", "create", repo_name,
+        "--public", "--description", description,
+        "--source=.", "--remote=origin", "--push"
+    ], cwd=repo_path)
+    if not success:
+        if is_auth_error(stderr):
+            get_preflight().invalidate()
+        return False, stderr or "", None
+    with span("github.username"):
+        username = get_username()
+    return True, "", f"https://github.com/{username}/{repo_name}"
+
+def web_url(remote):
+    # https://github.com/o/n.git and git@github.com:o/n.git both -> https://github.com/o/n
+    url = remote.strip()
+    if url.startswith("git@"):
+        host, _, path = url[4:].partition(':')
+        url = f"https://{host}/{path}"
+    return url[:-4] if url.endswith(".git") else url
+
+def find_published(repo_path, repo_name, use_api=False):
+    """URL of the GitHub repository an interrupted earlier attempt already created, or None"""
+    success, stdout, _ = run_command(["git", "remote", "get-url", "origin"], cwd=repo_path)
+    if success and stdout.strip():
+        return web_url(stdout)
+    if use_api:
+        client = get_client()
+        try:
+            return client.get_repo(client.username(), repo_name)["html_url"]
+        except (GitHubAPIError, OSError, KeyError):
+            return None
+    success, stdout, _ = run_command(["gh", "repo", "view", repo_name, "--json", "url", "--jq", ".url"])
+    return stdout.strip() if success and stdout.strip() else None
+
+def push_existing(repo_path, repo_url, use_api=False):
+    """Push to a repository that already exists on GitHub; return (success, stderr, url)"""
+    success, stdout, _ = run_command(["git", "remote", "get-url", "origin"], cwd=repo_path)
+    if not success or not stdout.strip():
+        success, _, stderr = run_command(["git", "remote", "add", "origin", repo_url + ".git"], cwd=repo_path)
+        if not success:
+            return False, stderr or "", None
+    env = get_client().push_env() if use_api else None
+    success, _, stderr = run_command(["git", "push", "-u", "origin", "HEAD"], cwd=repo_path, env=env)
+    if not success:
+        return False, stderr or "", None
+    return True, "", repo_url
+
+def _publish_with_api(repo_path, repo_name, description):
+    client = get_client()
+    try:
+        with span("github.api.create_repo"):
+            repo = client.create_repo(repo_name, description)
+    except GitHubAPIError as e:
+        if e.status == 401:
+            get_preflight().invalidate()
+        return False, str(e), None
+    except OSError as e:
+        return False, str(e), None
+
+    success, _, stderr = run_command(["git", "remote", "add", "origin", repo["clone_url"]], cwd=repo_path)
+    if not success:
+        return False, stderr or "", None
+    success, _, stderr = run_command(["git", "push", "-u", "origin", "HEAD"], cwd=repo_path, env=client.push_env())
+    if not success:
+        return False, stderr or "", None
+    return True, "", repo["html_url"]
+
+def generate_repo_files(idea, folder, log_callback, stream=False, fsync=None, **ai_options):
+    """Generate an idea and write its files under folder; return (ai_data, repo_name, repo_path) or None.
+
+    Files go to a staging folder that is renamed into place only once
+    complete (see place_repository); the caller releases the claim on
+    the returned repo_path.
+    """
+    ai_data = None
+    if stream:
+        # a cached answer is already complete, so there is nothing to stream
+        if ai_options.get("use_cache", True) and not ai_options.get("refresh", False):
+            ai_data = cached_response(idea, log_callback, ai_options.get("templates", True),
+                                      ai_options.get("json_mode", True), ai_options.get("split", False))
+        if ai_data is None:
+            return _generate_streaming(idea, folder, log_callback, ai_options.get("templates", True),
+                                       ai_options.get("json_mode", True), fsync)
+
+    if ai_data is None:
+        ai_data = generate_with_ai(idea, log_callback, **ai_options)
+    if not ai_data:
+        return None
+
+    repo_name = clean_repo_name(ai_data.get('repo_name', 'AIRepo'))
+    log_callback(f"📂 Creating repository structure: {repo_name}")
+    staging = os.path.join(folder, f"{staging_prefix()}{uuid.uuid4().hex[:12]}")
+    os.makedirs(staging)
+    if not create_files(staging, ai_data, log_callback, fsync, staged=True, idea=idea):
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+    return _place_generated(ai_data, folder, repo_name, staging, log_callback, fsync)
+
+def _generate_streaming(idea, folder, log_callback, templates=True, json_mode=True, fsync=None):
+    # chunks land in a staging folder from the first byte; it takes the repository name once complete
+    staging = os.path.join(folder, f"{staging_prefix()}{uuid.uuid4().hex[:12]}")
+    os.makedirs(staging)
+    writer = StreamingFileWriter(log_callback)
+    writer.set_repo_path(staging)
+    names = []
+
+    def on_event(event, key, value):
+        if event == "end" and key == "repo_name" and not names:
+            names.append(clean_repo_name(value if isinstance(value, str) else ''))
+            log_callback(f"📂 Creating repository structure: {names[0]}")
+        writer.handle(event, key, value)
+
+    ai_data = None
+    try:
+        ai_data = generate_with_ai_stream(idea, log_callback, on_event, templates=templates, json_mode=json_mode)
+    finally:
+        writer.close()
+        if not ai_data:
+            shutil.rmtree(staging, ignore_errors=True)
+    if not ai_data:
+        return None
+    if not write_templates(staging, ai_data, log_callback, fsync, idea):
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+    if (fsync or default_fsync()) != "none":
+        try:
+            sync_files(staging, writer.written)
+            sync_directories(staging, writer.written)
+        except OSError as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            log_callback(f"❌ Failed to create files: {str(e)}")
+            return None
+    repo_name = names[0] if names else clean_repo_name(ai_data.get('repo_name', 'AIRepo'))
+    return _place_generated(ai_data, folder, repo_name, staging, log_callback, fsync)
+
+def _place_generated(ai_data, folder, repo_name, staging, log_callback, fsync=None):
+    try:
+        placed_name, repo_path = place_repository(folder, repo_name, staging, fsync)
+    except (OSError, StageFailed) as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        log_callback(f"❌ {str(e)}")
+        return None
+    if placed_name != repo_name:
+        log_callback(f"⚠️ {repo_name} already exists; using {placed_name}")
+    return ai_data, placed_name, repo_path
+
+MAX_NAME_SUFFIX = 100
+
+def staging_prefix(job=None):
+    # journaled jobs tag their staging folders so a later attempt can find what a killed one left behind
+    if job is None:
+        return ".ai-repo-"
+    return f".ai-repo-{''.join(c if c.isalnum() else '-' for c in job.job_id)}-"
+
+def sweep_staging(folder, prefix, log_callback):
+    try:
+        names = [name for name in os.listdir(folder) if name.startswith(prefix)]
+    except OSError:
+        return
+    for name in names:
+        shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+    if names:
+        log_callback(f"🧹 Removed {len(names)} staging folder(s) left by an interrupted attempt")
+
+# repository folders that a running job of this process is writing, committing or publishing
+_claimed = set()
+_claimed_lock = threading.Lock()
+
+def claim_path(repo_path):
+    """Reserve repo_path for the calling job; False if another running job holds it"""
+    key = os.path.abspath(repo_path)
+    with _claimed_lock:
+        if key in _claimed:
+            return False
+        _claimed.add(key)
+        return True
+
+def release_path(repo_path):
+    with _claimed_lock:
+        _claimed.discard(os.path.abspath(repo_path))
+
+def place_repository(folder, repo_name, staging, fsync=None):
+    """Rename staging to repo_name inside folder and claim it; return (repo_name, repo_path).
+
+    If another job holds or took the name first, the staged files move to
+    the next free repo_name-2, repo_name-3, ... instead, so neither job
+    ever touches or publishes the other's tree. Unless the fsync policy
+    is none, the rename itself is made durable too.
+    """
+    for attempt in range(1, MAX_NAME_SUFFIX + 1):
+        name = repo_name if attempt == 1 else f"{repo_name}-{attempt}"
+        repo_path = os.path.join(folder, name)
+        if os.path.lexists(repo_path) or not claim_path(repo_path):
+            continue
+        try:
+            os.rename(staging, repo_path)
+        except OSError:
+            # another process created it between the check and the rename
+            release_path(repo_path)
+            if not os.path.isdir(staging):
+                raise
+            continue
+        if (fsync or default_fsync()) != "none":
+            try:
+                sync_directories(folder, ())
+            except OSError:
+                release_path(repo_path)
+                raise
+        return name, repo_path
+    raise StageFailed(f"No free folder name for {repo_name} in {folder}")
+
+def create_repository(idea, folder, log_callback, stream=False, use_api=False, generate=None, fsync=None, job=None,
+                      cancel=None, **ai_options):
+    """Run the whole idea -> published repository pipeline as a stage graph.
+
+    folder may be a path or a callable returning one (e.g. a folder
+    dialog); either way the AI request starts without waiting for it.
+    generate, if given, replaces generate_with_ai as generate(idea, log_callback);
+    otherwise ai_options (use_cache, refresh, ...) are passed to generate_with_ai.
+    fsync is the creator's fsync policy for the scaffold files.
+    job, a journal.Job, makes every completed step a checkpoint and skips
+    the steps an earlier run already finished. Journaled jobs do not stream,
+    so the saved AI payload is always complete. Setting cancel, a
+    threading.Event, stops the run before its next step starts.
+    """
+    with span("pipeline.total"):
+        result = _create_repository(idea, folder, log_callback, stream and generate is None and job is None, use_api,
+                                    generate, fsync, job, cancel, ai_options)
+    increment(f"pipeline.{result['status']}")
+    return result
+
+def _create_repository(idea, folder, log_callback, stream, use_api, custom_generate, fsync, job, cancel, ai_options):
+    result = {"idea": idea, "status": "failed", "repo_name": None,
+              "repo_path": None, "repo_url": None, "error": None}
+
+    def fail(message):
+        log_callback(f"❌ {message}")
+        raise StageFailed(message)
+
+    def pick_folder(done):
+        target = folder() if callable(folder) else folder
+        if not target:
+            fail("Operation cancelled - No folder selected")
+        if not destination_writable(target):
+            fail(f"Destination is not writable: {target}")
+        return target
+
+    def check_github(done):
+        return get_preflight().results()
+
+    def checkpoint(state, **fields):
+        if job is not None:
+            job.advance(state, **fields)
+
+    def generate(done):
+        if job is not None and job.payload is not None:
+            log_callback("📒 Resuming from the journal: reusing the saved AI result")
+            return job.payload
+        log_callback("🧠 Generating repository structure with AI...")
+        if stream:
+            generated = generate_repo_files(idea, done["folder"], log_callback, True, fsync, **ai_options)
+            if not generated:
+                raise StageFailed("AI generation failed")
+            claimed.append(generated[2])
+            return generated
+        if custom_generate is not None:
+            ai_data = custom_generate(idea, log_callback)
+        else:
+            ai_data = generate_with_ai(idea, log_callback, **ai_options)
+        if not ai_data:
+            raise StageFailed("AI generation failed")
+        checkpoint("generated", payload=ai_data)
+        return ai_data
+
+    def prepare(done):
+        # git init and identity setup only need the destination, not the AI output
+        prefix = staging_prefix(job)
+        if job is not None and job.attempts > 1:
+            sweep_staging(done["folder"], prefix, log_callback)
+        staging = os.path.join(done["folder"], f"{prefix}{uuid.uuid4().hex[:12]}")
+        os.makedirs(staging)
+        try:
+            prepare_repository(staging)
+        except Exception:
+            pass
+        return staging
+
+    def write_files(done):
+        if stream:
+            return done["generate"]
+        ai_data = done["generate"]
+        if job is not None and job.reached("files_written") and job.repo_path and os.path.isdir(job.repo_path):
+            log_callback(f"📒 Files already written to {job.repo_path}")
+            resumed["files"] = True
+            return ai_data, job.repo_name, job.repo_path
+        repo_name = clean_repo_name(ai_data.get('repo_name', 'AIRepo'))
+        log_callback(f"📂 Creating repository structure: {repo_name}")
+        target = os.path.join(done["folder"], repo_name)
+        if os.path.exists(target) and claim_path(target):
+            claimed.append(target)
+            # an earlier run left the folder behind: write into it rather than replace it
+            if not create_files(target, ai_data, log_callback, fsync, idea=idea):
+                fail("Could not write the repository files")
+            checkpoint("files_written", repo_name=repo_name, repo_path=target)
+            return ai_data, repo_name, target
+        if not create_files(done["prepare"], ai_data, log_callback, fsync, staged=True, idea=idea):
+            fail("Could not write the repository files")
+        # the repository only shows up under its real name once every file is in place
+        placed_name, repo_path = place_repository(done["folder"], repo_name, done["prepare"], fsync)
+        claimed.append(repo_path)
+        if placed_name != repo_name:
+            log_callback(f"⚠️ {repo_name} was taken by another job meanwhile; using {placed_name}")
+            repo_name = placed_name
+        checkpoint("files_written", repo_name=repo_name, repo_path=repo_path)
+        return ai_data, repo_name, repo_path
+
+    def commit(done):
+        _, _, repo_path = done["files"]
+        if resumed.get("files") and job.reached("committed"):
+            return
+        log_callback("🔧 Initializing Git repository...")
+        success, error = init_and_commit(repo_path, log_callback)
+        if not success:
+            fail(error)
+        checkpoint("committed")
+        log_callback("✅ Git repository initialized and committed successfully")
+
+    def publish(done):
+        ai_data, repo_name, repo_path = done["files"]
+        log_callback("🚀 Publishing to GitHub...")
+        desc = ai_data.get('description', 'AI-generated repository')
+        # an earlier attempt may have died after creating the repository but before its checkpoint
+        existing = find_published(repo_path, repo_name, use_api) if job is not None and job.attempts > 1 else None
+        if existing:
+            log_callback(f"📒 {existing} already exists from an earlier attempt; pushing to it")
+            success, stderr, repo_url = push_existing(repo_path, existing, use_api)
+        else:
+            success, stderr, repo_url = publish_repo(repo_path, repo_name, desc, use_api)
+        if not success:
+            fail(f"GitHub publication failed: {stderr.strip()}")
+        checkpoint("published", repo_url=repo_url)
+        return repo_url
+
+    stages = [
+        # a cancelled folder dialog ends the run right away; generation finishes in the background for the cache
+        Stage("folder", pick_folder, fatal=True),
+        Stage("preflight", check_github),
+        Stage("generate", generate, ("folder",) if stream else ()),
+        Stage("files", write_files, ("generate",) if stream else ("generate", "prepare")),
+        Stage("commit", commit, ("files",)),
+        Stage("publish", publish, ("commit", "preflight")),
+    ]
+    if not stream:
+        stages.append(Stage("prepare", prepare, ("folder",)))
+
+    claimed = []
+    # steps whose earlier output this run found on disk and reused
+    resumed = {}
+    try:
+        run = run_graph(stages, cancel=cancel)
+    finally:
+        for path in claimed:
+            release_path(path)
+
+    staging = run.results.get("prepare")
+    if staging and os.path.isdir(staging):
+        shutil.rmtree(staging, ignore_errors=True)
+
+    if "files" in run.results:
+        _, result["repo_name"], result["repo_path"] = run.results["files"]
+    result["critical_path"] = run.critical_path()
+    result["stages"] = run.report()
+
+    failure = run.first_error()
+    if failure:
+        name, error = failure
+        if isinstance(error, StageCancelled):
+            log_callback(f"🛑 {str(error)}")
+        elif not isinstance(error, StageFailed):
+            log_callback(f"❌ Unexpected system error: {str(error)}")
+        result["error"] = str(error)
+        if job is not None and not isinstance(error, StageCancelled):
+            # a cancelled job may already be running elsewhere; its journal entry is no longer ours to mark
+            job.fail(str(error))
+        return result
+
+    result["repo_url"] = run.results["publish"]
+    result["status"] = "created"
+    log_callback(f"⏱️ Critical path: {' → '.join(result['critical_path'])} ({run.finished - run.started:.1f}s)")
+    return result
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from file_manager.github_utils import run_command
+from metrics.timing import span
+
+PREFLIGHT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "preflight.json")
+
+PROBES = {
+    "git": ["git", "--version"],
+    "gh": ["gh", "--version"],
+    "gh_auth": ["gh", "auth", "status"],
+    "username": ["gh", "api", "user", "--jq", ".login"],
+}
+
+AUTH_ERROR_HINTS = ("gh auth login", "authentication", "not logged", "HTTP 401", "Bad credentials")
+
+def is_auth_error(stderr):
+    return any(hint.lower() in (stderr or '').lower() for hint in AUTH_ERROR_HINTS)
+
+def destination_writable(folder):
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with tempfile.TemporaryFile(dir=folder):
+            pass
+        return True
+    except OSError:
+        return False
+
+class Preflight:
+    """Probes git, gh, gh auth and the GitHub login once, in parallel.
+
+    Results are kept in memory and in a small JSON file so later runs
+    within ttl seconds skip the subprocesses entirely. invalidate() drops
+    both copies, e.g. after GitHub reports an authentication error.
+    """
+
+    def __init__(self, path=PREFLIGHT_PATH, ttl=6 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results = None
+
+    def _fresh(self, results):
+        if results is None:
+            return False
+        # a failed auth probe is retried soon, the user may be running 'gh auth login' right now
+        ttl = self.ttl if results.get("gh_auth", {}).get("ok") else min(self.ttl, 60)
+        return time.time() - results.get("checked_at", 0) < ttl
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                results = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return results if self._fresh(results) else None
+
+    def _save(self, results):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(results, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def probe(self):
+        with span("preflight.probe"), ThreadPoolExecutor(max_workers=len(PROBES)) as pool:
+            futures = {name: pool.submit(run_command, cmd) for name, cmd in PROBES.items()}
+        results = {"checked_at": time.time()}
+        for name, future in futures.items():
+            success, stdout, stderr = future.result()
+            detail = (stdout or stderr or '').strip().splitlines()
+            results[name] = {"ok": success, "detail": detail[0] if detail else ''}
+        results["username"]["value"] = results["username"]["detail"] if results["username"]["ok"] else None
+        return results
+
+    def results(self, refresh=False):
+        with self._lock:
+            if refresh or not self._fresh(self._results):
+                self._results = None if refresh else self._load()
+                if self._results is None:
+                    self._results = self.probe()
+                    # an unauthenticated result is not worth remembering across runs
+                    if self._results["gh_auth"]["ok"]:
+                        self._save(self._results)
+            return self._results
+
+    def cached(self):
+        with self._lock:
+            if self._fresh(self._results):
+                return self._results
+            self._results = self._load()
+            return self._results
+
+    def invalidate(self):
+        with self._lock:
+            self._results = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def git_ready(self):
+        return self.results()["git"]["ok"]
+
+    def github_ready(self):
+        results = self.results()
+        return results["gh"]["ok"] and results["gh_auth"]["ok"]
+
+    def username(self):
+        return self.results()["username"]["value"] or "user"
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_preflight():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Preflight(os.getenv("ai_repo_preflight_path") or PREFLIGHT_PATH)
+    return _default
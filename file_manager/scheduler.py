@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from metrics.timing import observe
+
+class StageFailed(Exception):
+    pass
+
+class StageCancelled(StageFailed):
+    pass
+
+class Stage:
+    def __init__(self, name, func, deps=(), fatal=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        # a fatal stage's failure ends the whole run at once
+        self.fatal = fatal
+
+class GraphRun:
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+        self.skipped = []
+        self.timings = {}
+        self.deps = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def ok(self):
+        return not self.errors and not self.skipped
+
+    def first_error(self):
+        if not self.errors:
+            return None
+        name = min(self.errors, key=lambda n: self.timings[n][1])
+        return name, self.errors[name]
+
+    def critical_path(self):
+        """Walk back from the last stage to finish through whichever dependency finished last"""
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            done = [d for d in self.deps.get(name, ()) if d in self.timings]
+            if not done:
+                break
+            name = max(done, key=lambda n: self.timings[n][1])
+            path.append(name)
+        return path[::-1]
+
+    def report(self):
+        return {name: {"start": round(start - self.started, 4), "end": round(end - self.started, 4)}
+                for name, (start, end) in self.timings.items()}
+
+def run_graph(stages, metric_prefix="pipeline", cancel=None):
+    """Run stages as soon as all of their dependencies have succeeded.
+
+    Each stage function receives a dict with the results of every stage
+    finished so far. A stage that raises fails, and everything that
+    depends on it, directly or not, is skipped. When a fatal stage fails
+    the run returns without waiting: stages already running finish in the
+    background (their side effects, such as cache writes, still happen)
+    and their results are dropped. Once cancel (a threading.Event) is set,
+    every stage that has not started yet fails with StageCancelled instead
+    of running.
+    """
+    run = GraphRun()
+    by_name = {stage.name: stage for stage in stages}
+    run.deps = {stage.name: stage.deps for stage in stages}
+    pending = dict(by_name)
+    running = {}
+
+    def execute(stage):
+        # an abandoned run swaps in fresh dicts, so a straggler cannot change what the caller reads
+        results, timings = run.results, run.timings
+        started = time.perf_counter()
+        try:
+            if cancel is not None and cancel.is_set():
+                raise StageCancelled(f"Cancelled before the {stage.name} step")
+            return stage.func(results)
+        finally:
+            ended = time.perf_counter()
+            timings[stage.name] = (started, ended)
+            observe(f"{metric_prefix}.{stage.name}", ended - started)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, len(stages)))
+    try:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep in run.errors or dep in run.skipped for dep in stage.deps):
+                    run.skipped.append(name)
+                    del pending[name]
+                elif all(dep in run.results for dep in stage.deps):
+                    running[pool.submit(execute, stage)] = name
+                    del pending[name]
+            if not running:
+                # nothing can make progress: unknown or cyclic dependencies
+                run.skipped.extend(pending)
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    run.results[name] = future.result()
+                except Exception as e:
+                    run.errors[name] = e
+                    if by_name[name].fatal:
+                        run.skipped.extend(pending)
+                        run.skipped.extend(running.values())
+                        pending.clear()
+                        run.results, run.timings = dict(run.results), dict(run.timings)
+                        running = {}
+                        break
+    finally:
+        pool.shutdown(wait=False)
+    run.finished = time.perf_counter()
+    return run
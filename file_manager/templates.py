@@ -0,0 +1,182 @@
+import datetime
+import re
+from functools import lru_cache
+
+from file_manager.git_objects import global_config
+
+MIT_LICENSE = """MIT License
+
+Copyright (c) {year} {holder}
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+COMMON_GITIGNORE = """# OS and editor files
+.DS_Store
+Thumbs.db
+.idea/
+.vscode/
+*.swp
+
+# Environment
+.env
+.env.*
+"""
+
+GITIGNORES = {
+    "python": """# Python
+__pycache__/
+*.py[cod]
+*.egg-info/
+.eggs/
+build/
+dist/
+.venv/
+venv/
+.pytest_cache/
+.mypy_cache/
+.coverage
+htmlcov/
+.ipynb_checkpoints/
+""",
+    "node": """# Node
+node_modules/
+npm-debug.log*
+yarn-debug.log*
+yarn-error.log*
+.pnpm-debug.log*
+dist/
+build/
+coverage/
+.next/
+.nuxt/
+""",
+    "java": """# Java
+*.class
+*.jar
+*.war
+target/
+build/
+.gradle/
+out/
+""",
+    "go": """# Go
+*.exe
+*.test
+*.out
+bin/
+vendor/
+""",
+    "rust": """# Rust
+target/
+**/*.rs.bk
+""",
+    "ruby": """# Ruby
+*.gem
+.bundle/
+vendor/bundle/
+log/
+tmp/
+coverage/
+""",
+    "dotnet": """# .NET
+bin/
+obj/
+*.user
+*.suo
+packages/
+""",
+    "cpp": """# C / C++
+*.o
+*.obj
+*.so
+*.dll
+*.dylib
+*.a
+*.lib
+*.exe
+build/
+cmake-build-*/
+CMakeFiles/
+CMakeCache.txt
+""",
+    "php": """# PHP
+vendor/
+composer.phar
+.phpunit.result.cache
+""",
+}
+
+# words in the idea or the generated text that point at a stack
+STACK_KEYWORDS = {
+    "python": ("python", "django", "flask", "fastapi", "pandas", "numpy", "pytorch", "tensorflow", "pip", "pytest",
+               "streamlit", "jupyter", "scrapy", "tkinter"),
+    "node": ("node", "nodejs", "javascript", "typescript", "npm", "yarn", "react", "vue", "angular", "express",
+             "nextjs", "svelte", "deno"),
+    "java": ("java", "spring", "maven", "gradle", "kotlin", "android"),
+    "go": ("golang", "go.mod"),
+    "rust": ("rust", "cargo", "tokio"),
+    "ruby": ("ruby", "rails", "gem", "bundler", "sinatra"),
+    "dotnet": ("c#", "csharp", ".net", "dotnet", "asp.net", "unity", "blazor"),
+    "cpp": ("c++", "cpp", "cmake", "arduino"),
+    "php": ("php", "laravel", "symfony", "composer", "wordpress"),
+}
+
+KEYWORD_INDEX = {word: stack for stack, words in STACK_KEYWORDS.items() for word in words}
+
+def detect_stacks(*texts):
+    """Stacks mentioned in texts, most mentioned first; Python when nothing matches"""
+    counts = {}
+    for text in texts:
+        for word in re.findall(r"[a-z0-9+#.]+", (text or '').lower()):
+            stack = KEYWORD_INDEX.get(word) or KEYWORD_INDEX.get(word.strip('.'))
+            if stack:
+                counts[stack] = counts.get(stack, 0) + 1
+    if not counts:
+        return ("python",)
+    return tuple(sorted(counts, key=lambda s: (-counts[s], s)))
+
+@lru_cache(maxsize=None)
+def gitignore_for(stacks):
+    return '\n'.join([GITIGNORES[s] for s in stacks if s in GITIGNORES] + [COMMON_GITIGNORE])
+
+@lru_cache(maxsize=None)
+def license_for(holder, year):
+    return MIT_LICENSE.format(year=year, holder=holder)
+
+@lru_cache(maxsize=1)
+def license_holder():
+    return global_config(strict=False).get("user.name")
+
+def template_files(data, idea=None):
+    """Text for the deterministic artifacts data does not already carry; idea helps pick the stack"""
+    missing = {}
+    if not (data.get('license_text') or '').strip():
+        holder = license_holder() or f"{data.get('repo_name') or 'the'} contributors"
+        missing['license_text'] = license_for(holder, datetime.date.today().year)
+    if not (data.get('gitignore') or '').strip():
+        # a non-empty requirements.txt only makes sense for a Python project
+        hint = "python" if (data.get('requirements') or '').strip() else ''
+        stacks = detect_stacks(idea, data.get('description'), data.get('readme'), hint)
+        missing['gitignore'] = gitignore_for(stacks)
+    return missing
+
+def with_templates(data, idea=None):
+    missing = template_files(data, idea)
+    return {**data, **missing} if missing else data
@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from file_manager.journal import job_key
+
+QUEUE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "queue.sqlite")
+LEASE_SECONDS = 120
+MAX_DELIVERIES = 3
+# several processes write the same file; wait for the lock rather than failing
+BUSY_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL UNIQUE,
+    idea TEXT NOT NULL,
+    options TEXT NOT NULL,
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_token TEXT,
+    lease_until REAL,
+    deliveries INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (state, lease_until);
+"""
+
+class LeaseLost(Exception):
+    pass
+
+class Task:
+    def __init__(self, row):
+        self.task_id = row["task_id"]
+        self.idea = row["idea"]
+        self.options = json.loads(row["options"])
+        self.token = row["lease_token"]
+        self.lease_until = row["lease_until"]
+        self.deliveries = row["deliveries"]
+
+class WorkQueue:
+    """Task queue in one SQLite file shared by any number of worker processes.
+
+    claim() leases the oldest pending task, or one whose lease ran out,
+    for lease seconds; the holder keeps it alive with heartbeat() and
+    ends it with complete(). Every lease carries a fresh token, so a
+    worker that lost its lease can neither extend nor finish a task
+    someone else now holds. A task whose lease expires max_deliveries
+    times is marked failed instead of being handed out again.
+    """
+
+    def __init__(self, path=QUEUE_PATH, lease=LEASE_SECONDS, max_deliveries=MAX_DELIVERIES):
+        self.path = path
+        self.lease = lease
+        self.max_deliveries = max_deliveries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def enqueue(self, ideas, options=None):
+        """Add ideas as pending tasks; ideas already queued under the same key are skipped. Return the count added"""
+        now = time.time()
+        encoded = json.dumps(options or {}, sort_keys=True)
+        rows = [(job_key(index, idea), idea, encoded, now, now) for index, idea in enumerate(ideas, 1)]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany("INSERT OR IGNORE INTO tasks (task_id, idea, options, state, created, updated) "
+                                 "VALUES (?, ?, ?, 'pending', ?, ?)", rows)
+            self._db.execute("COMMIT")
+            return self._db.total_changes - before
+
+    def claim(self, worker):
+        """Lease the next available task to worker, or return None when there is none right now"""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes can never pick the same row
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("UPDATE tasks SET state = 'failed', error = ?, lease_token = NULL, updated = ? "
+                                 "WHERE state = 'leased' AND lease_until < ? AND deliveries >= ?",
+                                 (f"lease expired {self.max_deliveries} times", now, now, self.max_deliveries))
+                row = self._db.execute("SELECT seq FROM tasks WHERE state = 'pending' "
+                                       "OR (state = 'leased' AND lease_until < ?) ORDER BY seq LIMIT 1",
+                                       (now,)).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute("UPDATE tasks SET state = 'leased', worker = ?, lease_token = ?, lease_until = ?, "
+                                 "deliveries = deliveries + 1, updated = ? WHERE seq = ?",
+                                 (worker, uuid.uuid4().hex, now + self.lease, now, row["seq"]))
+                task = self._db.execute("SELECT * FROM tasks WHERE seq = ?", (row["seq"],)).fetchone()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return Task(task)
+
+    def heartbeat(self, task):
+        """Extend task's lease; raise LeaseLost if it expired and went to someone else"""
+        now = time.time()
+        with self._lock:
+            changed = self._db.execute("UPDATE tasks SET lease_until = ?, updated = ? "
+                                       "WHERE task_id = ? AND lease_token = ? AND state = 'leased'",
+                                       (now + self.lease, now, task.task_id, task.token)).rowcount
+        if not changed:
+            raise LeaseLost(task.task_id)
+        task.lease_until = now + self.lease
+
+    def complete(self, task, result):
+        """Record the pipeline result; raise LeaseLost if task is no longer ours"""
+        state = "done" if result.get("status") == "created" else "failed"
+        with self._lock:
+            changed = self._db.execute("UPDATE tasks SET state = ?, result = ?, error = ?, lease_token = NULL, "
+                                       "updated = ? WHERE task_id = ? AND lease_token = ? AND state = 'leased'",
+                                       (state, json.dumps(result, ensure_ascii=False, default=str),
+                                        result.get("error"), time.time(), task.task_id, task.token)).rowcount
+        if not changed:
+            raise LeaseLost(task.task_id)
+
+    def release(self, task):
+        # hand a task back untouched, e.g. when the worker shuts down before starting it
+        with self._lock:
+            self._db.execute("UPDATE tasks SET state = 'pending', lease_token = NULL, lease_until = NULL, "
+                             "deliveries = deliveries - 1, updated = ? WHERE task_id = ? AND lease_token = ?",
+                             (time.time(), task.task_id, task.token))
+
+    def retry_failed(self):
+        with self._lock:
+            return self._db.execute("UPDATE tasks SET state = 'pending', deliveries = 0, error = NULL, updated = ? "
+                                    "WHERE state = 'failed'", (time.time(),)).rowcount
+
+    def unfinished(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tasks WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def results(self):
+        with self._lock:
+            rows = self._db.execute("SELECT task_id, state, deliveries, worker, result, error FROM tasks "
+                                    "ORDER BY seq").fetchall()
+        return [{"task": row["task_id"], "state": row["state"], "deliveries": row["deliveries"],
+                 "worker": row["worker"], "error": row["error"],
+                 "result": json.loads(row["result"]) if row["result"] else None} for row in rows]
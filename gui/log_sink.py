@@ -0,0 +1,112 @@
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime
+
+SPILL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "logs", "gui.log")
+
+def classify(message, tag="info"):
+    """Pick the colour tag for a log line from its emoji/keywords"""
+    if "✅" in message or "SUCCESS" in message:
+        return "success"
+    if "❌" in message or "failed" in message or "Error" in message:
+        return "error"
+    if "⚠️" in message or "Warning" in message:
+        return "warning"
+    if "🔍" in message or "🧠" in message or "🚀" in message:
+        return "info"
+    return tag
+
+class LogSink:
+    """Thread-safe log buffer drained into a Tk text widget by the main loop.
+
+    Producers only put tuples on a queue; the Tk thread inserts every
+    pending line in a single insert() call a fixed number of times per
+    second, keeps at most max_lines in the widget and moves older lines
+    to a rotating log file.
+    """
+
+    def __init__(self, root, widget, max_lines=2000, fps=20, max_batch=500, spill_path=SPILL_PATH):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval = max(1, int(1000 / fps))
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.spill = None
+        if spill_path:
+            self.spill = logging.getLogger(f"ai_repo_creator.gui.{id(self)}")
+            self.spill.propagate = False
+            self.spill.setLevel(logging.INFO)
+            self._spill_path = spill_path
+        self._spill_ready = False
+        self._after_id = None
+
+    def push(self, message, tag="info"):
+        self.queue.put((datetime.now().strftime("%H:%M:%S"), message, tag))
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _drain(self):
+        self._after_id = None
+        try:
+            self.flush()
+            self._after_id = self.root.after(self.interval, self._drain)
+        except Exception:
+            # the window is being destroyed
+            pass
+
+    def flush(self):
+        segments = []
+        for _ in range(self.max_batch):
+            try:
+                timestamp, message, tag = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            segments += [f"[{timestamp}] ", "timestamp", f"{message}\n", classify(message, tag)]
+        if not segments:
+            return
+        self.widget.config(state='normal')
+        self.widget.insert('end', *segments)
+        self._trim()
+        self.widget.see('end')
+        self.widget.config(state='disabled')
+
+    def _trim(self):
+        lines = int(self.widget.index('end-1c').split('.')[0]) - 1
+        excess = lines - self.max_lines
+        if excess <= 0:
+            return
+        if self.spill is not None:
+            self._write_spill(self.widget.get('1.0', f'{excess + 1}.0'))
+        self.widget.delete('1.0', f'{excess + 1}.0')
+
+    def _write_spill(self, text):
+        if not self._spill_ready:
+            try:
+                os.makedirs(os.path.dirname(self._spill_path), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    self._spill_path, maxBytes=1024 * 1024, backupCount=5, encoding='utf-8')
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.spill.addHandler(handler)
+            except OSError:
+                self.spill = None
+                return
+            self._spill_ready = True
+        self.spill.info(text.rstrip('\n'))
+
+    def clear(self):
+        self.widget.config(state='normal')
+        self.widget.delete(1.0, 'end')
+        self.widget.config(state='disabled')
@@ -3,14 +3,19 @@ import subprocess
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
-from datetime import datetime
+import time
 
-from ai.generator import generate_with_ai
-from file_manager.github_utils import check_github_cli, run_command, get_username
-from file_manager.creator import create_files
+from ai.generator import generate_with_ai, load_sdk, warm_up
+from file_manager.github_utils import check_github_cli
+from file_manager.pipeline import create_repository
+from gui.log_sink import LogSink
+from gui.speculative import SpeculativeGenerator
+from metrics.timing import registry
 
 os.environ["PATH"] += r";C:\Program Files\GitHub CLI"
 
+PLACEHOLDER_IDEA = 'A Python web scraper for extracting product data from e-commerce sites...'
+
 class SingleClickRepoCreator:
     def __init__(self):
         self.root = tk.Tk()
@@ -18,6 +23,7 @@ class SingleClickRepoCreator:
         self.root.geometry("900x700")
         self.root.configure(bg='#0A0E1A')
         self.root.resizable(True, True)
+        self.sdk_ready = threading.Event()
         
         # Enhanced color scheme
         self.bg = '#0A0E1A'           # Deeper dark blue
@@ -167,7 +173,61 @@ class SingleClickRepoCreator:
         )
         text_container.pack(fill='x', pady=(0, 10))
         
-        self.idea_entry.insert('1.0', 'A Python web scraper for extracting product data from e-commerce sites...')
+        # Generation options
+        options_row = tk.Frame(input_content, bg=self.card)
+        options_row.pack(fill='x')
+        
+        self.stream_var = tk.BooleanVar(value=False)
+        stream_check = tk.Checkbutton(options_row,
+                                      text="Stream files to disk while the AI writes them",
+                                      variable=self.stream_var,
+                                      font=('Segoe UI', 10),
+                                      bg=self.card, fg=self.text_secondary,
+                                      activebackground=self.card,
+                                      activeforeground=self.text,
+                                      selectcolor=self.surface,
+                                      bd=0, highlightthickness=0)
+        stream_check.pack(side='left')
+        
+        self.refresh_var = tk.BooleanVar(value=False)
+        refresh_check = tk.Checkbutton(options_row,
+                                       text="Ignore cached AI answer",
+                                       variable=self.refresh_var,
+                                       font=('Segoe UI', 10),
+                                       bg=self.card, fg=self.text_secondary,
+                                       activebackground=self.card,
+                                       activeforeground=self.text,
+                                       selectcolor=self.surface,
+                                       bd=0, highlightthickness=0)
+        refresh_check.pack(side='left', padx=(20, 0))
+        
+        self.speculative_var = tk.BooleanVar(value=False)
+        speculative_check = tk.Checkbutton(options_row,
+                                           text="Start generating while I type",
+                                           variable=self.speculative_var,
+                                           command=self.on_speculative_toggle,
+                                           font=('Segoe UI', 10),
+                                           bg=self.card, fg=self.text_secondary,
+                                           activebackground=self.card,
+                                           activeforeground=self.text,
+                                           selectcolor=self.surface,
+                                           bd=0, highlightthickness=0)
+        speculative_check.pack(side='left', padx=(20, 0))
+        self.speculative = SpeculativeGenerator(self.root)
+        
+        self.split_var = tk.BooleanVar(value=False)
+        split_check = tk.Checkbutton(options_row,
+                                     text="Generate files in parallel",
+                                     variable=self.split_var,
+                                     font=('Segoe UI', 10),
+                                     bg=self.card, fg=self.text_secondary,
+                                     activebackground=self.card,
+                                     activeforeground=self.text,
+                                     selectcolor=self.surface,
+                                     bd=0, highlightthickness=0)
+        split_check.pack(side='left', padx=(20, 0))
+        
+        self.idea_entry.insert('1.0', PLACEHOLDER_IDEA)
         
         # Bind events for input validation feedback
         self.idea_entry.bind('<KeyRelease>', self.on_text_change)
@@ -260,6 +320,10 @@ class SingleClickRepoCreator:
         self.log_area.tag_configure("info", foreground=self.primary)
         self.log_area.tag_configure("timestamp", foreground=self.text_secondary)
         
+        # Worker threads only queue lines; the main loop inserts them in batches
+        self.log_sink = LogSink(self.root, self.log_area)
+        self.log_sink.start()
+        
         # Footer with system info
         footer = tk.Frame(main_container, bg=self.surface, height=40)
         footer.pack(fill='x')
@@ -280,9 +344,9 @@ class SingleClickRepoCreator:
                                         bg=self.surface, fg=self.text_secondary)
         self.connection_status.pack(side='right')
         
-        # Initial system check
+        # Initial system check, deferred until the first frame has been drawn
         self.log("🔍 Initializing system components...", "info")
-        self.check_systems()
+        self.root.after_idle(self.check_systems)
         
     def on_text_change(self, event):
         """Handle text input changes"""
@@ -291,6 +355,22 @@ class SingleClickRepoCreator:
             self.update_input_status("● Valid", self.success)
         else:
             self.update_input_status("● Too short", "#EF4444")
+        if self.speculative_var.get():
+            self.schedule_speculation(content)
+            
+    def on_speculative_toggle(self):
+        """Start or drop background generation when the option changes"""
+        if self.speculative_var.get():
+            self.schedule_speculation(self.idea_entry.get('1.0', 'end-1c').strip())
+        else:
+            self.speculative.cancel()
+
+    def schedule_speculation(self, content):
+        """Draft the idea in the background, never the untouched placeholder"""
+        if content == PLACEHOLDER_IDEA:
+            self.speculative.cancel()
+        else:
+            self.speculative.schedule(content)
             
     def update_input_status(self, text, color):
         """Update input status indicator"""
@@ -306,49 +386,55 @@ class SingleClickRepoCreator:
         
     def clear_logs(self):
         """Clear the log area"""
-        self.log_area.config(state='normal')
-        self.log_area.delete(1.0, tk.END)
-        self.log_area.config(state='disabled')
+        self.log_sink.clear()
         
     def check_systems(self):
         """Enhanced system checks with better status updates"""
         def check():
             try:
-                check_github_cli(self.log)
-                self.connection_status.config(text="✅ All systems ready", fg=self.success)
+                ready = check_github_cli(self.log)
+                load_sdk()
+                self.sdk_ready.set()
+                if ready:
+                    self.connection_status.config(text="✅ All systems ready", fg=self.success)
+                else:
+                    self.connection_status.config(text="⚠️ System issues detected", fg=self.accent)
+                warm_up(self.log)
             except Exception as e:
                 self.connection_status.config(text="⚠️ System issues detected", fg=self.accent)
                 
         threading.Thread(target=check, daemon=True).start()
         
     def log(self, message, tag="info"):
-        """Enhanced logging with colored output and better formatting"""
-        self.log_area.config(state='normal')
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Insert timestamp
-        self.log_area.insert('end', f"[{timestamp}] ", "timestamp")
-        
-        # Insert message with appropriate tag
-        if "✅" in message or "SUCCESS" in message:
-            tag = "success"
-        elif "❌" in message or "failed" in message or "Error" in message:
-            tag = "error"
-        elif "⚠️" in message or "Warning" in message:
-            tag = "warning"
-        elif "🔍" in message or "🧠" in message or "🚀" in message:
-            tag = "info"
-            
-        self.log_area.insert('end', f"{message}\n", tag)
-        self.log_area.see('end')
-        self.log_area.config(state='disabled')
-        self.root.update_idletasks()
+        """Queue a log line; safe to call from any thread"""
+        self.log_sink.push(message, tag)
         
     def create_magic(self):
         idea = self.idea_entry.get('1.0', 'end-1c').strip()
-        if not idea or idea == 'A Python web scraper for extracting product data from e-commerce sites...':
+        if not idea or idea == PLACEHOLDER_IDEA:
             messagebox.showwarning("Input Required", "Please describe your repository idea!")
             return
+        stream = self.stream_var.get()
+        refresh = self.refresh_var.get()
+        split = self.split_var.get()
+        generate = None
+        speculated = self.speculative.take(idea) if self.speculative_var.get() and not refresh else None
+        if speculated:
+            future, lines = speculated
+            
+            def generate(idea, log_callback):
+                log_callback("⚡ Using the draft generated while you were typing")
+                try:
+                    data = future.result()
+                except Exception as e:
+                    log_callback(f"⚠️ The draft failed ({str(e)}); generating again")
+                    return generate_with_ai(idea, log_callback, split=split)
+                if not data:
+                    log_callback("⚠️ The draft came back empty; generating again")
+                    return generate_with_ai(idea, log_callback, split=split)
+                for line in lines:
+                    log_callback(line)
+                return data
             
         # Enhanced button state for processing
         self.magic_button.config(
@@ -363,84 +449,24 @@ class SingleClickRepoCreator:
         
         def magic_process():
             original_cwd = os.getcwd()
+            started = time.perf_counter()
             try:
-                self.log("📁 Please select destination folder for your repository...", "info")
-                self.root.update()
-                
-                folder = filedialog.askdirectory(title="Select folder for your new repository")
-                if not folder:
-                    self.log("❌ Operation cancelled - No folder selected", "error")
-                    return
-                    
-                self.log(f"✅ Destination selected: {folder}", "success")
-                
-                self.log("🧠 Generating repository structure with AI...", "info")
-                ai_data = generate_with_ai(idea, self.log)
-                if not ai_data:
-                    return
-                    
-                repo_name = ai_data.get('repo_name', 'AIRepo')
-                repo_name = ''.join(c if c.isalnum() or c in '-_' else '-' for c in repo_name)
-                repo_name = repo_name.strip('-_')
-                if not repo_name:
-                    repo_name = 'AIRepo'
-                    
-                repo_path = os.path.join(folder, repo_name)
-                
-                self.log(f"📂 Creating repository structure: {repo_name}", "info")
-                os.makedirs(repo_path, exist_ok=True)
+                def ask_folder():
+                    self.log("📁 Please select destination folder for your repository...", "info")
+                    folder = filedialog.askdirectory(title="Select folder for your new repository")
+                    if folder:
+                        self.log(f"✅ Destination selected: {folder}", "success")
+                    return folder
                 
-                create_files(repo_path, ai_data, self.log)
-                
-                self.log("🔧 Initializing Git repository...", "info")
-                
-                success, _, stderr = run_command(["git", "init"], cwd=repo_path)
-                if not success:
-                    self.log(f"❌ Git initialization failed: {stderr}", "error")
-                    return
-                
-                success, _, _ = run_command(["git", "config", "user.name"], cwd=repo_path)
-                if not success:
-                    self.log("🔧 Configuring Git user settings...", "info")
-                    run_command(["git", "config", "user.name", "AI Repo Creator"], cwd=repo_path)
-                    run_command(["git", "config", "user.email", "ai@example.com"], cwd=repo_path)
-                
-                success, _, stderr = run_command(["git", "add", "."], cwd=repo_path)
-                if not success:
-                    self.log(f"❌ Failed to stage files: {stderr}", "error")
-                    return
-                
-                success, stdout, _ = run_command(["git", "status", "--porcelain"], cwd=repo_path)
-                if not success or not stdout.strip():
-                    self.log("❌ No files available for commit", "error")
-                    return
-                
-                commit_msg = "✨ Initial commit - repo created with AI"  #before changing this please star this repository thank you
-                success, _, stderr = run_command(["git", "commit", "-m", commit_msg], cwd=repo_path)
-                if not success:
-                    self.log(f"❌ Commit failed: {stderr}", "error")
-                    return
-                
-                self.log("✅ Git repository initialized and committed successfully", "success")
-                
-                self.log("🚀 Publishing to GitHub...", "info")
-                desc = ai_data.get('description', 'AI-generated repository')
-                
-                success, _, stderr = run_command([
-                    "gh", "repo", "create", repo_name,
-                    "--public", "--description", desc,
-                    "--source=.", "--remote=origin", "--push"
-                ], cwd=repo_path)
-                
-                if not success:
-                    self.log(f"❌ GitHub publication failed: {stderr}", "error")
-                    if "already exists" in stderr:
+                # The AI request starts right away and runs while the folder dialog is open
+                outcome = create_repository(idea, ask_folder, self.log, stream=stream, refresh=refresh,
+                                            split=split, generate=generate)
+                if outcome["status"] != "created":
+                    if "already exists" in (outcome["error"] or ""):
                         self.log("💡 Repository name conflict - Please try with a different name", "warning")
                     return
                 
-                username = get_username()
-                repo_url = f"https://github.com/{username}/{repo_name}"
-                
+                repo_name, repo_path, repo_url = outcome["repo_name"], outcome["repo_path"], outcome["repo_url"]
                 self.log("🎉 REPOSITORY CREATED SUCCESSFULLY!", "success")
                 self.log(f"🌐 GitHub URL: {repo_url}", "info")
                 self.log(f"📍 Local path: {repo_path}", "info")
@@ -463,6 +489,11 @@ class SingleClickRepoCreator:
                 messagebox.showerror("System Error", f"An unexpected error occurred:\n\n{str(e)}")
             finally:
                 os.chdir(original_cwd)
+                registry.observe("gui.total", time.perf_counter() - started)
+                try:
+                    registry.export()
+                except OSError:
+                    pass
                 self.magic_button.config(
                     text="⚡ CREATE REPOSITORY", 
                     state='normal', 
@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ai.cache import normalize_idea
+from ai.generator import generate_with_ai
+
+# stale requests already sent keep running (their answers still fill the cache)
+MAX_IN_FLIGHT = 4
+
+class SpeculativeGenerator:
+    """Runs generate_with_ai on the idea text while the user is still typing.
+
+    Edits are debounced and a new text supersedes the previous request.
+    A superseded request that has not started yet is cancelled; one
+    already in flight is ignored but keeps its worker until it finishes,
+    which is why there are a few workers: a new draft never queues
+    behind it. Log lines are held back and replayed only if the result
+    is actually used.
+    """
+
+    def __init__(self, root, delay_ms=1200, min_length=20, generate=generate_with_ai):
+        self.root = root
+        self.delay_ms = delay_ms
+        self.min_length = min_length
+        self.generate = generate
+        self.executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="speculative")
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._current = None
+
+    def schedule(self, text):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if len(text.strip()) <= self.min_length:
+            return
+        self._after_id = self.root.after(self.delay_ms, lambda: self._start(text))
+
+    def _start(self, text):
+        self._after_id = None
+        key = normalize_idea(text)
+        with self._lock:
+            if self._current and self._current["key"] == key:
+                return
+            if self._current:
+                self._current["future"].cancel()
+            lines = []
+            future = self.executor.submit(self.generate, text.strip(), lines.append)
+            self._current = {"key": key, "future": future, "lines": lines}
+
+    def take(self, idea):
+        """Return (future, buffered log lines) if a speculative run matches idea, else None"""
+        with self._lock:
+            current = self._current
+            if not current or current["key"] != normalize_idea(idea):
+                return None
+            self._current = None
+            future = current["future"]
+            if not (future.running() or future.done()):
+                # still queued behind stale requests: starting fresh is faster than waiting for them
+                future.cancel()
+                return None
+            return current["future"], current["lines"]
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        with self._lock:
+            if self._current:
+                self._current["future"].cancel()
+            self._current = None
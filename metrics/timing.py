@@ -0,0 +1,122 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-repo-creator", "metrics")
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+class Histogram:
+    """Latency histogram with Prometheus buckets and a sample reservoir for exact-ish quantiles"""
+
+    def __init__(self, max_samples=10000):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.samples = []
+        self.max_samples = max_samples
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < self.max_samples:
+                self.samples[slot] = seconds
+
+    def quantile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "min": self.min, "max": self.max,
+                "p50": self.quantile(0.50), "p95": self.quantile(0.95), "p99": self.quantile(0.99)}
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def quantile(self, stage, q):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            return histogram.quantile(q) if histogram else None
+
+    def snapshot(self):
+        with self._lock:
+            return {"stages": {stage: h.summary() for stage, h in sorted(self.histograms.items())},
+                    "counters": dict(sorted(self.counters.items()))}
+
+    def prometheus(self):
+        lines = ["# HELP ai_repo_stage_seconds Latency of repository creation pipeline stages",
+                 "# TYPE ai_repo_stage_seconds histogram"]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(BUCKETS, h.counts):
+                    cumulative += count
+                    lines.append(f'ai_repo_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'ai_repo_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {h.count}')
+                lines.append(f'ai_repo_stage_seconds_sum{{stage="{label}"}} {h.sum:.6f}')
+                lines.append(f'ai_repo_stage_seconds_count{{stage="{label}"}} {h.count}')
+            if self.counters:
+                lines += ["# HELP ai_repo_events_total Pipeline event counters",
+                          "# TYPE ai_repo_events_total counter"]
+                for name, value in sorted(self.counters.items()):
+                    lines.append(f'ai_repo_events_total{{name="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory=METRICS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "metrics.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        with open(os.path.join(directory, "metrics.prom"), 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        return directory
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+registry = Registry()
+span = registry.span
+observe = registry.observe
+increment = registry.increment
@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from ai.generator import load_sdk, warm_up
+from ai.ratelimit import KeyPool, set_limiter
+from ai.resilience import Policy, set_policy
+from file_manager.creator import FSYNC_POLICIES
+from file_manager.pipeline import create_repository
+from file_manager.preflight import get_preflight
+from metrics.timing import increment, registry
+
+# options a client may set per job; everything else is fixed when the server starts
+JOB_OPTIONS = {"stream": bool, "use_cache": bool, "refresh": bool, "reuse_similar": bool,
+               "split": bool, "templates": bool, "json_mode": bool, "use_api": bool}
+FINISHED = ("created", "failed")
+MAX_FINISHED_JOBS = 1000
+MAX_BODY_BYTES = 64 * 1024
+# idle streams send a comment this often so proxies and clients keep the connection open
+KEEPALIVE_SECONDS = 15
+
+print_lock = threading.Lock()
+
+def log_line(message):
+    with print_lock:
+        print(message, flush=True)
+
+class ServerJob:
+    def __init__(self, idea, options):
+        self.id = uuid.uuid4().hex[:16]
+        self.idea = idea
+        self.options = options
+        self.status = "queued"
+        self.log = []
+        self.result = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.changed = threading.Condition()
+
+    def add_log(self, message):
+        with self.changed:
+            self.log.append(message)
+            self.changed.notify_all()
+
+    def finish(self, result):
+        with self.changed:
+            self.result = result
+            self.status = result["status"]
+            self.finished = time.time()
+            self.changed.notify_all()
+
+    def wait(self, seen, timeout):
+        """Block until there are log lines past seen or the job is done; return (new lines, finished)"""
+        with self.changed:
+            self.changed.wait_for(lambda: len(self.log) > seen or self.status in FINISHED, timeout)
+            return self.log[seen:], self.status in FINISHED
+
+    def describe(self, since=0):
+        with self.changed:
+            return {"id": self.id, "idea": self.idea, "status": self.status, "options": self.options,
+                    "submitted": self.submitted, "started": self.started, "finished": self.finished,
+                    "log": self.log[since:], "log_next": len(self.log), "result": self.result}
+
+class JobService:
+    """Runs submitted ideas on a fixed pool of warm worker threads.
+
+    The SDK, the shared model client, the preflight results and the AI
+    response cache are all process-wide, so they stay hot from one job
+    to the next. Submitting only records the job and queues it.
+    """
+
+    def __init__(self, folder, workers=4, fsync=None):
+        self.folder = folder
+        self.workers = workers
+        self.fsync = fsync
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def warm(self, log=log_line):
+        load_sdk()
+        warm_up(log)
+        results = get_preflight().results()
+        if not (results["gh"]["ok"] and results["gh_auth"]["ok"]):
+            log("⚠️ GitHub CLI is missing or not authenticated; jobs will fail at the publish step")
+
+    def submit(self, idea, options):
+        job = ServerJob(idea, options)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old()
+        self._pool.submit(self._run, job)
+        increment("server.submitted")
+        return job
+
+    def _forget_old(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        with job.changed:
+            job.started = time.time()
+            job.status = "running"
+        job.add_log("▶️ Job started")
+        try:
+            result = create_repository(job.idea, self.folder, job.add_log, fsync=self.fsync, **job.options)
+        except Exception as e:
+            result = {"idea": job.idea, "status": "failed", "repo_name": None,
+                      "repo_path": None, "repo_url": None, "error": str(e)}
+            job.add_log(f"❌ Unexpected system error: {str(e)}")
+        job.finish(result)
+        log_line(f"[{job.id}] {'✅' if result['status'] == 'created' else '❌'} "
+                 f"{result['repo_url'] or result['error'] or ''}")
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def counts(self):
+        counts = {}
+        for job in self.jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def parse_job(body):
+    """Validate a submission body; return (idea, options) or raise ValueError"""
+    if not isinstance(body, dict):
+        raise ValueError("expected a JSON object")
+    idea = body.get("idea")
+    if not isinstance(idea, str) or not idea.strip():
+        raise ValueError("'idea' must be a non-empty string")
+    options = body.get("options") or {}
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be an object")
+    unknown = sorted(set(options) - set(JOB_OPTIONS))
+    if unknown:
+        raise ValueError(f"unknown options: {', '.join(unknown)}")
+    for name, value in options.items():
+        if not isinstance(value, JOB_OPTIONS[name]):
+            raise ValueError(f"option '{name}' must be a {JOB_OPTIONS[name].__name__}")
+    return idea.strip(), options
+
+class Handler(BaseHTTPRequestHandler):
+    """JSON API:
+
+    POST /jobs                 {"idea": ..., "options": {...}} -> 202 with the job id
+    GET  /jobs                 every known job, without logs
+    GET  /jobs/<id>?since=N    status plus log lines from N on
+    GET  /jobs/<id>/events     progress as server-sent events until the job ends
+    GET  /jobs/<id>/result     the pipeline result, 202 while still running
+    GET  /health, /metrics     readiness and stage timings (?format=prometheus)
+    """
+
+    service = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json", headers=()):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, {"error": message})
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        return parts, {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._error(404, "not found")
+        length = self.headers.get("Content-Length")
+        if length is None or not length.strip().isdigit() or int(length) > MAX_BODY_BYTES:
+            # an unread body would be taken for the next request on this connection
+            self.close_connection = True
+            if length is None:
+                return self._error(411, "Content-Length is required")
+            if not length.strip().isdigit():
+                return self._error(400, "Content-Length must be a non-negative integer")
+            return self._error(413, "request body too large")
+        length = int(length)
+        try:
+            idea, options = parse_job(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as e:
+            return self._error(400, str(e))
+        job = self.service.submit(idea, options)
+        links = {"self": f"/jobs/{job.id}", "events": f"/jobs/{job.id}/events", "result": f"/jobs/{job.id}/result"}
+        self._send(202, {"id": job.id, "status": job.status, "links": links}, headers=[("Location", links["self"])])
+
+    def do_GET(self):
+        parts, query = self._route()
+        if parts == ["health"]:
+            return self._send(200, {"status": "ok", "workers": self.service.workers, "jobs": self.service.counts()})
+        if parts == ["metrics"]:
+            if query.get("format") == "prometheus":
+                return self._send(200, registry.prometheus().encode('utf-8'), "text/plain; version=0.0.4")
+            return self._send(200, registry.snapshot())
+        if parts == ["jobs"]:
+            return self._send(200, {"jobs": [{key: value for key, value in job.describe().items() if key != "log"}
+                                             for job in self.service.jobs()]})
+        if len(parts) < 2 or parts[0] != "jobs" or len(parts) > 3:
+            return self._error(404, "not found")
+        job = self.service.get(parts[1])
+        if job is None:
+            return self._error(404, f"unknown job {parts[1]}")
+        if len(parts) == 2:
+            try:
+                since = max(0, int(query.get("since", 0)))
+            except ValueError:
+                return self._error(400, "'since' must be an integer")
+            return self._send(200, job.describe(since))
+        if parts[2] == "result":
+            if job.status not in FINISHED:
+                return self._send(202, {"id": job.id, "status": job.status})
+            return self._send(200, job.result)
+        if parts[2] == "events":
+            return self._stream(job)
+        return self._error(404, "not found")
+
+    def _stream(self, job):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        seen = 0
+        try:
+            while True:
+                lines, finished = job.wait(seen, KEEPALIVE_SECONDS)
+                for line in lines:
+                    self.wfile.write(f"event: log\ndata: {json.dumps(line, ensure_ascii=False)}\n\n".encode('utf-8'))
+                seen += len(lines)
+                if finished and not lines:
+                    payload = json.dumps(job.result, ensure_ascii=False)
+                    self.wfile.write(f"event: result\ndata: {payload}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                    return
+                if not lines:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve repository creation as a local HTTP job API")
+    parser.add_argument("--dest", required=True, help="folder where the repositories are created")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="number of repositories processed in parallel")
+    parser.add_argument("--deadline", type=float, default=90.0, help="seconds allowed for each AI call, retries included")
+    parser.add_argument("--retries", type=int, default=3, help="retries on transient AI errors (429, 5xx, timeouts)")
+    parser.add_argument("--hedge", action="store_true", help="send a second AI request when the first is slower than the observed p95")
+    parser.add_argument("--rpm", type=float, help="AI requests per minute allowed per API key (default: env ai_repo_rpm, else unlimited)")
+    parser.add_argument("--tpm", type=float, help="AI tokens per minute allowed per API key (default: env ai_repo_tpm, else unlimited)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, help="how scaffold files are flushed to disk (default: env ai_repo_fsync, else none)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dest, exist_ok=True)
+    set_limiter(KeyPool.from_env(args.rpm, args.tpm))
+    set_policy(Policy(deadline=args.deadline, retries=max(0, args.retries), hedge=args.hedge))
+    service = JobService(args.dest, max(1, args.workers), args.fsync)
+    service.warm()
+    Handler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    log_line(f"🌐 Serving on http://{args.host}:{server.server_port} with {service.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from file_manager.git_objects import NeedsGit, commit_initial
+
+TIMESTAMP = 1700000000
+FILES = {
+    "README.md": "# demo\n",
+    "app.log": "x", "sub/a.log": "x", "sub/keep.log": "x",
+    "build/out.o": "x", "src/build/out.o": "x", "src/buildx/ok.c": "x",
+    "docs/a.md": "x", "docs/x/b.md": "x", "docs/x/c.txt": "x",
+    "lib/deep/a/tmp/t.bin": "x", "lib/tmp.txt": "x",
+    "pkg/.gitignore": "*.gen\n!keep.gen\n/local/\n", "pkg/a.gen": "x", "pkg/keep.gen": "x",
+    "pkg/local/x.py": "x", "pkg/sub/local/y.py": "x",
+    "#hash": "x", "trail ": "x", "data[1].csv": "x", "data1.csv": "x",
+    "secret.key": "x", "notes.swp": "x",
+}
+GITIGNORE = (
+    "/*.log\n!sub/keep.log\n**/build\ndocs/*.md\nlib/**/tmp/\n\\#hash\ntrail\\ \n"
+    "data[0-9].csv\n*.sw[!a]\n"
+)
+
+def git(*args, cwd, env=None):
+    return subprocess.run(["git", *args], cwd=cwd, env=env, capture_output=True, text=True, check=True).stdout.strip()
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class CommitParityTest(unittest.TestCase):
+    """The in-process commit must produce the same ids as git add/commit"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        home = os.path.join(self.tmp, "home")
+        os.makedirs(home)
+        with open(os.path.join(home, ".gitconfig"), "w") as f:
+            f.write(f"[core]\n\texcludesFile = {os.path.join(home, 'global-ignore')}\n")
+        with open(os.path.join(home, "global-ignore"), "w") as f:
+            f.write("*.key\n")
+        date = f"{TIMESTAMP} +0000"
+        self.env = {"HOME": home, "XDG_CONFIG_HOME": os.path.join(home, ".config"), "TZ": "UTC",
+                    "GIT_CONFIG_NOSYSTEM": "1", "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+                    "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com",
+                    "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+        patcher = mock.patch.dict(os.environ, self.env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def write_tree(self, name, files):
+        root = os.path.join(self.tmp, name)
+        for rel, content in files.items():
+            path = os.path.join(root, *rel.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        return root
+
+    def git_commit(self, root, initial=True):
+        if initial:
+            git("init", "-q", cwd=root, env=os.environ)
+        git("add", ".", cwd=root, env=os.environ)
+        git("commit", "-q", "-m", "msg", cwd=root, env=os.environ)
+        return git("rev-parse", "HEAD", cwd=root)
+
+    def test_ignore_rules_match_git(self):
+        files = dict(FILES, **{".gitignore": GITIGNORE})
+        ours, theirs = self.write_tree("ours", files), self.write_tree("theirs", files)
+        _, sha = commit_initial(ours, "msg", TIMESTAMP)
+        expected = self.git_commit(theirs)
+        tracked = git("ls-tree", "-r", "--name-only", "HEAD", cwd=ours)
+        self.assertEqual(tracked, git("ls-tree", "-r", "--name-only", "HEAD", cwd=theirs))
+        self.assertEqual(sha, expected)
+        self.assertEqual(git("status", "--porcelain", "--untracked-files=all", cwd=ours), "")
+
+    def test_changed_tree_gets_a_second_commit(self):
+        ours, theirs = self.write_tree("ours", {"README.md": "one\n"}), self.write_tree("theirs", {"README.md": "one\n"})
+        _, first = commit_initial(ours, "msg", TIMESTAMP)
+        self.assertEqual(first, self.git_commit(theirs))
+        self.assertEqual(commit_initial(ours, "msg", TIMESTAMP), (True, first))
+        for root in (ours, theirs):
+            self.write_tree(os.path.basename(root), {"README.md": "two\n", "src/main.py": "print()\n"})
+        _, second = commit_initial(ours, "msg", TIMESTAMP)
+        self.assertEqual(second, self.git_commit(theirs, initial=False))
+        self.assertEqual(git("status", "--porcelain", cwd=ours), "")
+    def test_committer_env_is_kept_apart_from_author(self):
+        os.environ.update({"GIT_COMMITTER_NAME": "Bot", "GIT_COMMITTER_EMAIL": "bot@example.com",
+                           "GIT_COMMITTER_DATE": f"{TIMESTAMP + 60} +0200"})
+        ours, theirs = self.write_tree("ours", {"README.md": "one\n"}), self.write_tree("theirs", {"README.md": "one\n"})
+        _, sha = commit_initial(ours, "msg", TIMESTAMP)
+        self.assertEqual(sha, self.git_commit(theirs))
+        self.assertEqual(git("log", "-1", "--format=%an %cn %cd", "--date=raw", cwd=ours),
+                         f"Test Bot {TIMESTAMP + 60} +0200")
+
+    def test_unsupported_input_needs_git(self):
+        root = self.write_tree("links", {"README.md": "one\n"})
+        os.symlink("README.md", os.path.join(root, "link.md"))
+        with self.assertRaises(NeedsGit):
+            commit_initial(root, "msg", TIMESTAMP)
+        with open(os.path.join(os.environ["HOME"], ".gitconfig"), "a") as f:
+            f.write("[include]\n\tpath = extra.gitconfig\n")
+        with self.assertRaises(NeedsGit):
+            commit_initial(self.write_tree("include", {"README.md": "one\n"}), "msg", TIMESTAMP)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from file_manager.materializer import ManifestError, materialize, normalize_path
+
+class NormalizePathTest(unittest.TestCase):
+    def test_plain_paths_are_normalized(self):
+        self.assertEqual(normalize_path("src\\pkg/./mod.py"), "src/pkg/mod.py")
+        self.assertEqual(normalize_path("docs/.github/guide.md"), "docs/.github/guide.md")
+        self.assertEqual(normalize_path(".gitignore"), ".gitignore")
+
+    def test_escaping_paths_are_rejected(self):
+        for path in ("", ".", "/etc/passwd", "../x", "a/../../x", "C:/x"):
+            with self.subTest(path=path), self.assertRaises(ManifestError):
+                normalize_path(path)
+
+    def test_git_directory_is_rejected(self):
+        for path in (".git/config", ".GIT/hooks/pre-commit", "sub/.git/HEAD", ".git", ".git./config",
+                     ".Git /config", "GIT~1/config", "a/./.git/x"):
+            with self.subTest(path=path), self.assertRaises(ManifestError):
+                normalize_path(path)
+
+    def test_materialize_writes_nothing_for_a_git_path(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        with self.assertRaises(ManifestError):
+            materialize(root, {"README.md": "x", ".git/hooks/post-checkout": "#!/bin/sh\n"})
+        self.assertEqual(os.listdir(root), [])
+
+if __name__ == "__main__":
+    unittest.main()
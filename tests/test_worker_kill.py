@@ -0,0 +1,98 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from benchmarks.harness import sandbox
+from file_manager.journal import Journal
+from file_manager.work_queue import WorkQueue
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IDEAS = 16
+TIMEOUT = 180
+
+# a worker process whose AI model is the benchmark fake; gh is the fake from benchmarks/bin
+CHILD = r'''
+import sys
+from ai.generator import set_model
+from benchmarks.fake_model import FakeModel
+set_model(FakeModel(median=0.3))
+import worker
+sys.exit(worker.main(sys.argv[1:]))
+'''
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class WorkerKillTest(unittest.TestCase):
+    """Killing a worker mid-task loses and duplicates nothing once the rest drain the queue"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.queue_path = os.path.join(self.tmp, "queue.sqlite")
+        self.dest = os.path.join(self.tmp, "dest")
+        os.makedirs(self.dest)
+        self.procs = []
+        self.addCleanup(self.stop_all)
+
+    def stop_all(self):
+        for proc, log in self.procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            log.close()
+
+    def start_worker(self):
+        log = open(os.path.join(self.tmp, f"worker-{len(self.procs)}.log"), "w")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")])))
+        proc = subprocess.Popen([sys.executable, "-c", CHILD, "--queue", self.queue_path, "run", "--dest", self.dest,
+                                 "--threads", "2", "--lease", "1", "--max-deliveries", "5", "--idle-exit"],
+                                cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.procs.append((proc, log))
+        return proc
+
+    def wait_for_lease(self, queue, proc, deadline):
+        # kill only once the victim is really in the middle of a task
+        while time.monotonic() < deadline:
+            if any(t["state"] == "leased" and (t["worker"] or "").endswith(f":{proc.pid}") for t in queue.results()):
+                return
+            time.sleep(0.05)
+        self.fail("the worker never claimed a task")
+
+    def test_killed_worker_loses_and_duplicates_nothing(self):
+        with sandbox() as root:
+            queue = WorkQueue(self.queue_path)
+            self.addCleanup(queue.close)
+            queue.enqueue([f"kill test idea {i}: a command line tool number {i}" for i in range(IDEAS)],
+                          {"use_cache": False, "reuse_similar": False})
+            deadline = time.monotonic() + TIMEOUT
+            victim = self.start_worker()
+            self.start_worker()
+            self.wait_for_lease(queue, victim, deadline)
+            victim.kill()
+            victim.wait()
+            self.start_worker()
+            for proc, _ in self.procs:
+                proc.wait(timeout=max(1, deadline - time.monotonic()))
+
+            self.assertEqual(queue.counts(), {"done": IDEAS})
+            # the victim's tasks went out again after its leases ran out
+            self.assertTrue(any(task["deliveries"] > 1 for task in queue.results()))
+            journal = Journal(self.queue_path)
+            self.addCleanup(journal.close)
+            self.assertEqual(journal.counts(), {"published": IDEAS})
+            remotes = os.path.join(root, "remotes")
+            self.assertEqual(len(os.listdir(remotes)), IDEAS)
+            for name in os.listdir(remotes):
+                commits = subprocess.run(["git", "rev-list", "--all", "--count"], cwd=os.path.join(remotes, name),
+                                         capture_output=True, text=True).stdout.strip()
+                self.assertEqual(commits, "1", name)
+            # no staging folders left behind and no repository written twice under a -2 name
+            folders = sorted(os.listdir(self.dest))
+            self.assertEqual(len(folders), IDEAS, folders)
+            self.assertFalse([name for name in folders if name.startswith('.') or name.endswith('-2')])
+
+if __name__ == "__main__":
+    unittest.main()
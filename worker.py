@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+
+from ai.generator import warm_up
+from ai.ratelimit import KeyPool, set_limiter
+from ai.resilience import Policy, set_policy
+from batch import journaled_result, log_line, read_ideas, run_job
+from file_manager.creator import FSYNC_POLICIES
+from file_manager.journal import Journal
+from file_manager.work_queue import LEASE_SECONDS, MAX_DELIVERIES, QUEUE_PATH, LeaseLost, WorkQueue
+
+POLL_SECONDS = 1.0
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class Worker:
+    """Pulls tasks from a shared WorkQueue and runs the full pipeline for each.
+
+    Each process runs threads claim loops plus one heartbeat thread that
+    keeps every held lease alive. Pipeline progress is journaled in the
+    queue file, so a task re-delivered after its worker died resumes from
+    its last completed step instead of generating or publishing again.
+    A task whose lease is lost stops before its next step, so it never
+    publishes alongside the worker that took it over.
+    """
+
+    def __init__(self, queue, journal, folder, threads=2, idle_exit=False, log=log_line, **options):
+        self.queue = queue
+        self.journal = journal
+        self.folder = folder
+        self.threads = threads
+        self.idle_exit = idle_exit
+        self.log = log
+        self.options = options
+        self.name = worker_name()
+        self.stop = threading.Event()
+        # task_id -> the cancel event of a task this process is running
+        self.held = {}
+        self._held_lock = threading.Lock()
+        self.processed = 0
+
+    def _beat(self):
+        interval = max(0.05, self.queue.lease / 3)
+        while not self.stop.wait(interval):
+            with self._held_lock:
+                held = list(self.held.values())
+            for task, cancel in held:
+                if cancel.is_set():
+                    continue
+                try:
+                    self.queue.heartbeat(task)
+                except LeaseLost:
+                    cancel.set()
+                    self.log(f"[{task.task_id}] ⚠️ Lease lost; stopping before the next step")
+
+    def _run_task(self, task, cancel):
+        job = self.journal.open(task.task_id, task.idea)
+        if job.done:
+            # the task finished on an earlier delivery, only its completion was lost
+            return journaled_result(task.task_id, job)
+        options = {**self.options, **task.options, "cancel": cancel}
+        return run_job(task.task_id, task.idea, self.folder, options, self.log, job)
+
+    def _loop(self):
+        while not self.stop.is_set():
+            task = self.queue.claim(self.name)
+            if task is None:
+                if self.idle_exit and not self.queue.unfinished():
+                    return
+                self.stop.wait(POLL_SECONDS)
+                continue
+            if self.stop.is_set():
+                # stopping: hand it straight back instead of letting its lease run out
+                self.queue.release(task)
+                return
+            cancel = threading.Event()
+            with self._held_lock:
+                self.held[task.task_id] = (task, cancel)
+            try:
+                result = self._run_task(task, cancel)
+            finally:
+                with self._held_lock:
+                    self.held.pop(task.task_id, None)
+            try:
+                self.queue.complete(task, result)
+                self.processed += 1
+            except LeaseLost:
+                self.log(f"[{task.task_id}] ⚠️ Lease expired before the result was recorded")
+
+    def run(self):
+        beat = threading.Thread(target=self._beat, daemon=True)
+        beat.start()
+        loops = [threading.Thread(target=self._loop, name=f"worker-{i}") for i in range(self.threads)]
+        for thread in loops:
+            thread.start()
+        for thread in loops:
+            thread.join()
+        self.stop.set()
+        return self.processed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribute repository creation over worker processes sharing one queue")
+    parser.add_argument("--queue", default=os.getenv("ai_repo_queue") or QUEUE_PATH,
+                        help="SQLite queue file; put it on storage every worker can reach (default: env ai_repo_queue)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="add ideas to the queue")
+    enqueue.add_argument("ideas", help="JSONL (one {\"idea\": ...} per line) or CSV file with an 'idea' column, '-' for stdin")
+    enqueue.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto")
+    enqueue.add_argument("--no-cache", action="store_true", help="always call the AI, never read or write the response cache")
+    enqueue.add_argument("--no-reuse-similar", action="store_true", help="do not borrow .gitignore/LICENSE/requirements from near-duplicate ideas")
+    enqueue.add_argument("--ai-boilerplate", action="store_true", help="let the AI write LICENSE and .gitignore instead of using the bundled templates")
+    enqueue.add_argument("--free-form-json", action="store_true", help="do not declare a response schema; strip code fences from plain-text answers instead")
+    enqueue.add_argument("--split", action="store_true", help="request name, README, .gitignore/requirements and LICENSE concurrently as separate prompts")
+    enqueue.add_argument("--github-api", action="store_true", help="create repositories through the GitHub REST API instead of gh")
+
+    run = commands.add_parser("run", help="process tasks until stopped")
+    run.add_argument("--dest", required=True, help="folder where the repositories are created")
+    run.add_argument("--threads", type=int, default=2, help="tasks this process works on at once")
+    run.add_argument("--lease", type=float, default=LEASE_SECONDS, help="seconds a claimed task stays ours without a heartbeat")
+    run.add_argument("--max-deliveries", type=int, default=MAX_DELIVERIES, help="expired leases after which a task is failed")
+    run.add_argument("--idle-exit", action="store_true", help="exit once no task is pending or leased")
+    run.add_argument("--deadline", type=float, default=90.0, help="seconds allowed for each AI call, retries included")
+    run.add_argument("--retries", type=int, default=3, help="retries on transient AI errors (429, 5xx, timeouts)")
+    run.add_argument("--hedge", action="store_true", help="send a second AI request when the first is slower than the observed p95")
+    run.add_argument("--rpm", type=float, help="AI requests per minute allowed per API key for this process (default: env ai_repo_rpm)")
+    run.add_argument("--tpm", type=float, help="AI tokens per minute allowed per API key for this process (default: env ai_repo_tpm)")
+    run.add_argument("--fsync", choices=FSYNC_POLICIES, help="how scaffold files are flushed to disk (default: env ai_repo_fsync, else none)")
+
+    status = commands.add_parser("status", help="show task counts")
+    status.add_argument("--retry-failed", action="store_true", help="put failed tasks back in the queue")
+    status.add_argument("--json", action="store_true", help="print every task and its result as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        queue = WorkQueue(args.queue)
+        options = {"use_cache": not args.no_cache, "reuse_similar": not args.no_reuse_similar,
+                   "templates": not args.ai_boilerplate, "json_mode": not args.free_form_json,
+                   "split": args.split, "use_api": args.github_api}
+        added = queue.enqueue(read_ideas(args.ideas, args.format), options)
+        log_line(f"📥 {added} tasks added; queue now {queue.counts()}")
+        return 0
+
+    if args.command == "status":
+        queue = WorkQueue(args.queue)
+        if args.retry_failed:
+            log_line(f"🔁 {queue.retry_failed()} failed tasks queued again")
+        if args.json:
+            print(json.dumps(queue.results(), indent=2, ensure_ascii=False))
+        else:
+            log_line(f"📊 {queue.counts()}")
+        return 0
+
+    os.makedirs(args.dest, exist_ok=True)
+    queue = WorkQueue(args.queue, lease=args.lease, max_deliveries=args.max_deliveries)
+    journal = Journal(args.queue)
+    set_limiter(KeyPool.from_env(args.rpm, args.tpm))
+    set_policy(Policy(deadline=args.deadline, retries=max(0, args.retries), hedge=args.hedge))
+    warm_up(log_line)
+    worker = Worker(queue, journal, args.dest, max(1, args.threads), args.idle_exit, fsync=args.fsync)
+    # SIGTERM lets the tasks in hand finish; their leases would otherwise have to expire first
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop.set())
+    log_line(f"👷 Worker {worker.name} pulling from {args.queue} with {worker.threads} threads")
+    try:
+        processed = worker.run()
+    except KeyboardInterrupt:
+        worker.stop.set()
+        processed = worker.processed
+    log_line(f"👷 Worker {worker.name} finished {processed} tasks; queue now {queue.counts()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())